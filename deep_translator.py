@@ -15,6 +15,7 @@ Features include:
 - System tray icon for background operation.
 
 Requires: pyperclip, pystray, Pillow (PIL), keyboard, openai, requests, deepl
+Optional: orjson (faster JSON handling for DeepSeek requests)
 """
 
 import pyperclip
@@ -22,25 +23,37 @@ import threading
 import time
 import tkinter as tk
 from tkinter import messagebox, ttk
-from pystray import Icon, MenuItem, Menu
-from PIL import Image
-import keyboard
-from datetime import datetime
+# pystray, PIL and keyboard are imported where they are used (tray / hotkey setup)
 from openai import OpenAI
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 import signal
 import os
 import deepl
 import traceback
-from tkinter import ttk, font as tkFont, messagebox
+from tkinter import ttk, messagebox
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape as xml_escape
 import shutil
+import errno
 from tkinter import filedialog
 import subprocess
 import re # Added for cleaning rephrase results
+import atexit
+from collections import OrderedDict, deque
+import heapq
+import hashlib
+import queue
+import functools
+import concurrent.futures
+import ctypes
+try:
+    import orjson # Optional C JSON library, stdlib json is used when missing
+except ImportError:
+    orjson = None
 
 
 # --- Supported Languages ---
@@ -66,9 +79,34 @@ supported_languages = {
     }
 }
 
+# Dropdown values per provider, built once (Combobox accepts tuples directly)
+_lang_values_cache = {provider: tuple(langs) for provider, langs in supported_languages.items()}
+
+# --- DeepL Code Maps (Precomputed from supported_languages) ---
+# Target codes keep regional variants; source codes collapse them to the base language
+# (DeepL's source_lang accepts only 'EN' and 'PT', not 'EN-GB'/'EN-US'/'PT-PT').
+_DEEPL_SOURCE_VARIANTS = {"EN-GB": "EN", "EN-US": "EN", "PT-PT": "PT"}
+_DEEPL_TGT = dict(supported_languages["DeepL"])
+_DEEPL_SRC = {lang: _DEEPL_SOURCE_VARIANTS.get(code, code) for lang, code in _DEEPL_TGT.items()}
+_DEEPL_SRC.update(_DEEPL_SOURCE_VARIANTS) # Raw variant codes passed in directly
+
 # --- Configuration Files ---
 HISTORY_FILE = "translation_history.xml"
+HISTORY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S" # Entry timestamps (zero-padded, so they sort as strings)
+_HISTORY_CLOSE_TAG = b"</history>"
+_REQUIRED_FIELDS = ('time', 'provider', 'original', 'translated', 'rephrased', 'target_language') # Read for every loaded <item>
+# Layout of one appended <item>, matching what save_history_to_xml writes (values are XML-escaped)
+_HISTORY_ITEM_TEMPLATE = (
+    "  <item>\n"
+    "    <time>{time}</time>\n"
+    "    <original>{original}</original>\n"
+    "    <translated>{translated}</translated>\n"
+    "    <rephrased>{rephrased}</rephrased>\n"
+    "    <provider>{provider}</provider>\n"
+    "    <target_language>{target_language}</target_language>\n"
+    "  </item>\n")
 CONFIG_FILE = "config.xml"
+_config_mtime = None # mtime of CONFIG_FILE when the keys were last loaded
 
 # --- API Keys (Loaded from config file) ---
 OPENAI_API_KEY = None
@@ -78,10 +116,26 @@ DEEPL_API_KEY = None
 # --- API Clients (Initialised after loading keys) ---
 openai_client = None
 deepl_translator = None
+deepl_usage = None            # Last DeepL usage report (fetched when the client is created)
+
+# --- DeepSeek HTTP Session ---
+# One keep-alive session for all DeepSeek calls so the TLS connection is reused.
+# Transient failures (rate limiting, 5xx) are retried with a short backoff.
+DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+# Fixed parts of the request body; only the prompt string is spliced in per call
+_DEEPSEEK_BODY_PREFIX = b'{"model": "deepseek-chat", "messages": [{"role": "user", "content": '
+_DEEPSEEK_BODY_SUFFIX = b'}]}'
+deepseek_session = requests.Session()
+deepseek_session.headers.update({"Content-Type": "application/json"})
+deepseek_session.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset({"POST"}), raise_on_status=False) ))
 
 # --- Global Variables for GUI and State ---
 window = None
 original_textbox = None
+original_textbox_alive = False # Cleared by the box's <Destroy> binding; saves a winfo_exists() round-trip
 translated_textbox = None
 rephrased_textbox = None
 rephrase_button = None
@@ -100,17 +154,59 @@ history_data = []             # In-memory list of history items
 font_size = 13                # Default font size for text boxes
 tray_icon = None
 hotkey_processing = False     # Flag to prevent concurrent hotkey actions
+hotkey_lock = threading.Lock() # Makes the check-and-set of hotkey_processing atomic
+_last_clipboard_key = None    # clipboard_request_key of the forward translation now on screen (None if none/failed)
 api_dropdown = None
 history_lock = threading.Lock() # Lock for history file access
-config_lock = threading.Lock()  # Lock for config file access
+_history_dirty = threading.Event() # Set while history_data has changes not yet written to disk
+HISTORY_FLUSH_DELAY = 2.0       # Seconds to coalesce history changes into a single file write
+history_data_lock = threading.Lock() # Guards history_data together with the pending-append state below
+_history_pending = []           # New entries not yet appended to HISTORY_FILE
+_history_needs_rewrite = False  # Set when history_data changed in a way an append cannot express
+_history_keys = set()           # history_entry_key() of every entry in history_data (duplicate check)
+_history_dir_ready = False      # True once the directory of HISTORY_FILE is known to exist
+_history_loaded = threading.Event() # Set once the startup load of HISTORY_FILE has finished
+_button_update_pending = False  # True while an update_button_states run is queued
+HISTORY_PAGE_SIZE = 200         # History window entries rendered per page (more are added on scroll)
+_button_update_tr_to_en = False # action_was_tr_to_en of the latest update_button_states call
+config_lock = threading.RLock() # Lock for config file access (re-entrant: load_api_keys may recreate the file)
 config_window = None
 source_language_dropdown = None
 target_language_dropdown = None
+status_label = None           # Non-modal status line at the bottom of the main window
+_status_clear_job = None      # Pending 'after' job that clears the status line
 
 # Global variables to store the direction of the last translation for history
 last_history_source_language = ""
 last_history_target_language = ""
 
+# --- API Response Cache ---
+# Bounded LRU cache of successful API responses, keyed on the effective request inputs.
+# Lets repeated identical requests (e.g. Ctrl+C+C on the same text) skip the network.
+ASK_AI_CACHE_SIZE = 512
+_ask_ai_cache = OrderedDict()
+_ask_ai_cache_lock = threading.Lock() # ask_ai is called from worker threads
+
+# --- Rephrase Result Cleanup ---
+# Collapses blank lines between the numbered alternatives (compiled once at import)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# --- LLM Response Parsing ---
+# Whitespace around line breaks; collapsing it strips every line and drops blank ones
+_LINE_BREAK_WS_RE = re.compile(r'\s*\n\s*')
+
+@functools.lru_cache(maxsize=64)
+def llm_response_pattern(target_language, source_language):
+    """
+    Returns the compiled pattern that splits an LLM reply into its "<target> Translation:"
+    section (group 1) and optional "<source> Rephrased:" section (group 2). Cached per
+    language pair, so each pattern is compiled once.
+    """
+    tr_keyword = re.escape(f"{target_language} Translation:")
+    rep_keyword = re.escape(f"{source_language} Rephrased:")
+    # [^\S\n]: any whitespace but a line break, as line.strip() accepted before the marker
+    return re.compile(rf'^[^\S\n]*{tr_keyword}(.*?)(?:^[^\S\n]*{rep_keyword}(.*))?\Z', re.S | re.M)
+
 # --- Style Options for Rephrasing (Used by LLMs) ---
 style_options = {
     "Simple English": "in simple and clear English",
@@ -118,13 +214,46 @@ style_options = {
     "Casual English": "in casual conversational English"
 }
 
+# Plain-Python copies of the current dropdown selections, kept in sync by write traces
+# on style_var / api_provider_var. Reading them avoids a Tcl call per access and is
+# safe from the API worker threads.
+_current_style_str = style_options["Simple English"] # Default style
+_current_provider = None
+
+def update_selected_style(*_):
+    """Refreshes the cached style description (style_var write trace)."""
+    global _current_style_str
+    selected = style_var.get() if style_var else None
+    _current_style_str = style_options.get(selected, style_options["Simple English"])
+
+def update_selected_provider(*_):
+    """Refreshes the cached API provider name (api_provider_var write trace)."""
+    global _current_provider
+    _current_provider = api_provider_var.get() if api_provider_var else None
+
 def get_selected_style():
     """Returns the description for the currently selected rephrasing style."""
-    if style_var:
-        return style_options.get(style_var.get(), style_options["Simple English"])
-    return style_options["Simple English"] # Default style
+    return _current_style_str
+
+def get_selected_provider(default="DeepSeek"):
+    """Returns the currently selected API provider, or the default before the GUI exists."""
+    return _current_provider or default
 
 # --- Prompt Generation Functions ---
+# Template for the 'Translate & Rephrase' LLM prompt (filled via str.format_map)
+_FULL_PROMPT_TMPL = '''
+Given the following text in {source}:
+
+"{text}"
+
+1. Translate it into {target}.
+2. Rephrase the ORIGINAL {source} text {style}.
+
+Respond ONLY in this format:
+{target} Translation: ...
+{source} Rephrased: ...
+'''
+
 def full_prompt(text, source_language, target_language):
     """
     Generates the prompt for the 'Translate & Rephrase' action for LLMs.
@@ -132,89 +261,318 @@ def full_prompt(text, source_language, target_language):
     the *original* source text according to the selected style.
     Specifies the required response format.
     """
-    style = get_selected_style()
-    provider = api_provider_var.get() if api_provider_var else "DeepSeek"
+    provider = get_selected_provider()
     if provider in ["OpenAI", "DeepSeek"]:
-        return f'''
-Given the following text in {source_language}:
-
-"{text}"
-
-1. Translate it into {target_language}.
-2. Rephrase the ORIGINAL {source_language} text {style}.
-
-Respond ONLY in this format:
-{target_language} Translation: ...
-{source_language} Rephrased: ...
-'''
+        return _FULL_PROMPT_TMPL.format_map({
+            "source": source_language, "target": target_language,
+            "text": text, "style": get_selected_style() })
     # DeepL does not use this prompt format directly.
     return ""
 
+# Templates for the 'Rephrase Again' and 'Translate Back' LLM prompts
+_REPHRASE_PROMPT_TMPL = "Rephrase the following text in {source} {style} in 5 different ways. Provide the results in a numbered list (1. ..., 2. ..., etc.) without extra comments:\n\n{text}"
+_TRANSLATE_BACK_PROMPT_TMPL = "Translate the following text into {source}:\n\n{text}"
+
 def rephrase_prompt(text, source_language):
     """
     Generates the prompt for the 'Rephrase Again' action for LLMs.
     Asks the LLM to rephrase the source text in 5 different ways,
     according to the selected style, returning a numbered list.
     """
-    style = get_selected_style()
-    return f"Rephrase the following text in {source_language} {style} in 5 different ways. Provide the results in a numbered list (1. ..., 2. ..., etc.) without extra comments:\n\n{text}"
+    return _REPHRASE_PROMPT_TMPL.format_map({"source": source_language, "style": get_selected_style(), "text": text})
 
 def translate_to_source_prompt(text, source_language):
     """
     Generates the prompt for the 'Translate Back to Source' action for LLMs.
     Asks the LLM to translate the provided text into the specified source language.
     """
-    return f"Translate the following text into {source_language}:\n\n{text}"
+    return _TRANSLATE_BACK_PROMPT_TMPL.format_map({"source": source_language, "text": text})
 
 # --- DeepL Helper Functions ---
 def get_deepl_source_code(lang: str) -> str:
     """
     Gets the DeepL source language code.
-    Maps English variants ('English', 'English-GB', 'English-US') to 'EN'
+    English and Portuguese variants map to their base codes ('EN', 'PT')
     as required by DeepL's source_lang parameter.
-    For other languages, uses the code from the supported_languages dictionary.
-    """
-    code = supported_languages["DeepL"].get(lang, lang)
-    # --- Mappings for source_lang ---
-    # English variants -> EN
-    if code in ["EN-GB", "EN-US"]:
-        return "EN"
-    # Brazilian Portuguese -> PT
-    elif code == "PT-PT": # Check if other Portuguese variants exist in your dict
-        return "PT"
-    # Add mappings for other variants if needed (e.g., Chinese)
-    # --- End Mappings ---
-    else:
-        # For base languages (TR, DE, FR, etc.) or variants accepted as source, return the code directly.
-        return code
+    Unknown names are returned unchanged (assumed to already be a code).
+    """
+    return _DEEPL_SRC.get(lang, lang)
 
 def get_deepl_target_code(lang: str) -> str:
     """
     Gets the DeepL target language code from the dictionary.
     Target codes can include regional variations (e.g., EN-GB, EN-US, PT-BR).
     """
-    code = supported_languages["DeepL"].get(lang, lang)
-    return code
+    return _DEEPL_TGT.get(lang, lang)
+
+DEEPL_MAX_REQUEST_BYTES = 60 * 1024 # Per-request text size, well below DeepL's request body limit
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?。！？])(\s+)') # Whitespace after sentence-ending punctuation
+
+_LAST_WHITESPACE_RE = re.compile(r'.*\s', re.S) # Greedy: ends just after the last whitespace
+
+def split_overlong_piece(piece, max_bytes):
+    """
+    Cuts a piece with no usable sentence break into parts of at most max_bytes of UTF-8,
+    each ending after the last whitespace inside the budget when there is one (never
+    inside a character). Returns the list of parts; only the last one may be shorter.
+    """
+    parts = []
+    data = piece.encode('utf-8')
+    while len(data) > max_bytes:
+        head = data[:max_bytes].decode('utf-8', 'ignore') # 'ignore' drops a cut-off trailing character
+        match = _LAST_WHITESPACE_RE.match(head)
+        part = head[:match.end()] if match else head # No whitespace at all: hard cut
+        parts.append(part)
+        data = data[len(part.encode('utf-8')):]
+    parts.append(data.decode('utf-8'))
+    return parts
+
+def split_text_for_deepl(text, max_bytes=DEEPL_MAX_REQUEST_BYTES):
+    """
+    Splits text into (chunk, trailing_whitespace) pairs of at most max_bytes of UTF-8 each,
+    breaking after sentence-ending punctuation where possible. Text that already fits is
+    returned as a single chunk without being scanned.
+    """
+    if len(text.encode('utf-8')) <= max_bytes:
+        return [(text, "")]
+    parts = _SENTENCE_BREAK_RE.split(text) # sentence, separator, sentence, separator, ...
+    chunks, current, current_bytes = [], "", 0
+    for i in range(0, len(parts), 2):
+        piece = parts[i] + (parts[i + 1] if i + 1 < len(parts) else "")
+        piece_bytes = len(piece.encode('utf-8'))
+        if current and current_bytes + piece_bytes > max_bytes:
+            chunks.append(current); current, current_bytes = "", 0
+        if piece_bytes > max_bytes: # One overlong sentence: cut it into byte-budget pieces
+            *cut_pieces, piece = split_overlong_piece(piece, max_bytes)
+            chunks.extend(cut_pieces)
+            piece_bytes = len(piece.encode('utf-8'))
+        current += piece; current_bytes += piece_bytes
+    if current: chunks.append(current)
+    # Chunks are sent without their trailing whitespace, which is re-attached afterwards
+    return [(chunk.rstrip(), chunk[len(chunk.rstrip()):]) for chunk in chunks]
+
+DEEPL_MAX_BATCH_TEXTS = 50 # DeepL accepts at most 50 texts per translate request
+
+def split_deepl_batch(texts, max_texts=DEEPL_MAX_BATCH_TEXTS, max_bytes=DEEPL_MAX_REQUEST_BYTES):
+    """
+    Splits a list of texts into consecutive sub-lists that each stay within DeepL's per-request
+    limits (number of texts and total UTF-8 size). A single oversized text gets a batch of its own.
+    """
+    batches, current, current_bytes = [], [], 0
+    for text in texts:
+        text_bytes = len((text or "").encode('utf-8'))
+        if current and (len(current) >= max_texts or current_bytes + text_bytes > max_bytes):
+            batches.append(current); current, current_bytes = [], 0
+        current.append(text); current_bytes += text_bytes
+    if current: batches.append(current)
+    return batches
+
+def translate_deepl_chunks(chunks, target_lang_code, source_lang_code):
+    """
+    Translates the chunks from split_text_for_deepl in parallel through ask_ai and joins
+    the translations in order. Returns a DeepL result dict, or the first error string.
+    """
+    def translate_chunk(chunk):
+        return ask_ai(None, chunk, target_lang_code, source_lang_code, provider="DeepL") if chunk else {"translated": ""}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(4, len(chunks)), thread_name_prefix="DeepL-Chunk") as executor:
+        results = list(executor.map(translate_chunk, (chunk for chunk, _ in chunks)))
+    for result in results:
+        if not isinstance(result, dict): return result
+    return {"translated": "".join((result.get("translated") or "") + trailing
+                                  for result, (_, trailing) in zip(results, chunks)),
+            "rephrased": None}
+
+# --- API Rate Limiting ---
+class RateLimiter:
+    """
+    Token bucket that paces requests to one provider: up to `capacity` requests go out at
+    once, after that they are spaced to `rate` per second. Waiting here is cheaper than
+    getting HTTP 429 back and sitting out the retry backoff.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping as long as needed when the bucket is empty."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            self.tokens -= 1 # May go negative: concurrent callers queue up behind each other
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+# Requests per second and burst size per provider (kept below the published limits)
+RATE_LIMITERS = {
+    "OpenAI": RateLimiter(rate=500 / 60, capacity=10), # 500 RPM
+    "DeepSeek": RateLimiter(rate=5, capacity=10),
+    "DeepL": RateLimiter(rate=10, capacity=10),
+}
+
+def wait_for_rate_limit(provider):
+    """
+    Blocks until a request to provider may be sent (no-op for unknown providers).
+    ask_ai calls this for every request it sends; code that calls an API client directly
+    (the intermediate step of rephrase_again) must call it itself.
+    """
+    limiter = RATE_LIMITERS.get(provider)
+    if limiter: limiter.acquire()
+
+# --- Background Error Logging ---
+# API worker threads queue their error reports here instead of printing them inline, so
+# a slow console never holds up a request; one daemon thread formats and writes them.
+LOG_Q = deque(maxlen=1000)      # (message, exc_info) pairs; the oldest are dropped if writing falls behind
+LOG_EVENT = threading.Event()   # Set when LOG_Q has entries
+
+def log_error(message, exc_info=None):
+    """
+    Queues message for the log writer, with the traceback of exc_info (an exc_info triple)
+    or, by default, of the exception currently being handled (if any).
+    """
+    LOG_Q.append((message, exc_info if exc_info is not None else sys.exc_info()))
+    LOG_EVENT.set()
+
+def drain_error_log():
+    """Writes out every queued error report (traceback formatting happens here, not in the caller)."""
+    while LOG_Q:
+        message, exc_info = LOG_Q.popleft()
+        text = message + "\n"
+        if exc_info[0] is not None: text += "".join(traceback.format_exception(*exc_info))
+        try: sys.stderr.write(text)
+        except Exception: pass # No usable stderr (e.g. pythonw)
+
+def log_writer_loop():
+    """Background loop that writes queued error reports (runs in a daemon thread)."""
+    while True:
+        LOG_EVENT.wait()
+        LOG_EVENT.clear() # Before draining: reports queued meanwhile re-set it
+        drain_error_log()
+
+# --- API Worker Pool ---
+# Button actions run their API calls here instead of starting a new thread per click;
+# max_workers also bounds how many requests one user can have in flight.
+API_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="deep_tr")
+
+def _log_task_exception(future):
+    """Logs an exception that escaped an API task (a plain thread would have printed it too)."""
+    if not future.cancelled() and future.exception() is not None:
+        exc = future.exception()
+        # Not inside an except block here, so hand the traceback over explicitly
+        log_error(f"Unhandled error in API task: {type(exc).__name__}: {exc}", (type(exc), exc, exc.__traceback__))
+
+def submit_api_task(fn, *args):
+    """Runs fn(*args) on API_POOL and returns its Future."""
+    future = API_POOL.submit(fn, *args)
+    future.add_done_callback(_log_task_exception)
+    return future
 
 # --- API Interaction ---
-def ask_ai(prompt=None, original_text_for_deepl=None, target_lang_for_deepl=None, source_lang_for_deepl=None):
+def cache_digest(text):
+    """
+    16-byte BLAKE2b digest of a request text (or list of texts) for use in cache keys, so the
+    cache does not keep every prompt alive and long texts hash once instead of on each lookup.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(text, (list, tuple)):
+        h.update(b"L") # A batch never collides with a single text
+        for part in text:
+            encoded = (part or "").encode('utf-8')
+            h.update(len(encoded).to_bytes(8, 'little')); h.update(encoded)
+    else:
+        h.update(b"S"); h.update((text or "").encode('utf-8'))
+    return h.digest()
+
+def get_cached_response(key):
+    """Returns a cached API response for the key (marking it recently used), or None."""
+    with _ask_ai_cache_lock:
+        result = _ask_ai_cache.get(key)
+        if result is None:
+            return None
+        _ask_ai_cache.move_to_end(key)
+    # DeepL results are dicts; hand out a copy so callers can't alter the cached entry
+    return dict(result) if isinstance(result, dict) else result
+
+def cache_response(key, result):
+    """Stores a successful API response, evicting the least recently used entry when full."""
+    with _ask_ai_cache_lock:
+        _ask_ai_cache[key] = dict(result) if isinstance(result, dict) else result
+        _ask_ai_cache.move_to_end(key)
+        while len(_ask_ai_cache) > ASK_AI_CACHE_SIZE:
+            _ask_ai_cache.popitem(last=False)
+
+def deepseek_chat(prompt):
+    """
+    Sends a single chat completion request to the DeepSeek API over the shared session.
+    Safe to call from several worker threads at once, so independent requests overlap
+    their network latency. Network errors propagate to the caller (ask_ai handles them).
+    """
+    headers = {"Authorization": f"Bearer {DEEPSEEK_API_KEY}"} # Content-Type is a session default
+    if orjson:
+        body = orjson.dumps({"model": "deepseek-chat", "messages": [{"role": "user", "content": prompt}]})
+    else:
+        # json.dumps of the prompt alone escapes it (ASCII-only output) without walking a payload dict
+        body = _DEEPSEEK_BODY_PREFIX + json.dumps(prompt).encode('ascii') + _DEEPSEEK_BODY_SUFFIX
+    r = deepseek_session.post(DEEPSEEK_API_URL, headers=headers, data=body, timeout=30)
+    r.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+    response_json = orjson.loads(r.content) if orjson else r.json()
+    if "choices" in response_json and response_json["choices"]:
+        return response_json["choices"][0]["message"]["content"]
+    else: return f"__ERROR__::DeepSeek returned unexpected response: {response_json}"
+
+def ask_ai(prompt=None, original_text_for_deepl=None, target_lang_for_deepl=None, source_lang_for_deepl=None, provider=None, use_cache=True, cache_if=None):
     """
     Sends a request to the selected AI API provider.
 
     Handles requests for OpenAI, DeepSeek, and DeepL.
+    Successful responses are served from an LRU cache when the same request is repeated.
     Returns the API response content or a dictionary (for DeepL)
     or an error string prefixed with '__ERROR__::'.
 
     Args:
         prompt (str, optional): The prompt for LLMs (OpenAI, DeepSeek).
-        original_text_for_deepl (str, optional): Text for DeepL translation.
+        original_text_for_deepl (str | list[str], optional): Text for DeepL translation.
+            A list is translated in a single request and yields a list of translations.
         target_lang_for_deepl (str, optional): Target language code for DeepL.
         source_lang_for_deepl (str, optional): Source language code for DeepL.
+        provider (str, optional): Provider to use instead of the current selection
+            (for multi-step actions that must not switch provider part-way).
+        use_cache (bool, optional): False for requests that must produce new output on
+            every call (Rephrase Again): skips the cache lookup and does not store the result.
+        cache_if (callable, optional): Predicate on a successful result; only results it
+            accepts are cached (e.g. LLM replies the caller can actually parse).
 
     Returns:
         str | dict: API response or error string.
     """
-    provider = api_provider_var.get() if api_provider_var else "DeepSeek"
+    provider = provider or get_selected_provider()
+    if not use_cache:
+        wait_for_rate_limit(provider)
+        return _ask_ai_request(provider, prompt, original_text_for_deepl, target_lang_for_deepl, source_lang_for_deepl)
+    if provider == "DeepL":
+        cache_key = (provider, cache_digest(original_text_for_deepl), source_lang_for_deepl, target_lang_for_deepl)
+    else:
+        # The style is part of the key so switching styles never returns a stale rephrase.
+        # Nothing here varies per call, so callers wanting new output pass use_cache=False.
+        cache_key = (provider, get_selected_style(), cache_digest(prompt))
+
+    cached_result = get_cached_response(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    wait_for_rate_limit(provider) # Cache hits above never count against the limit
+    result = _ask_ai_request(provider, prompt, original_text_for_deepl, target_lang_for_deepl, source_lang_for_deepl)
+    # Only successful (and, with cache_if, usable) responses are cached; the rest are retried
+    if not (isinstance(result, str) and result.startswith("__ERROR__::")) and (cache_if is None or cache_if(result)):
+        cache_response(cache_key, result)
+    return result
+
+def _ask_ai_request(provider, prompt, original_text_for_deepl, target_lang_for_deepl, source_lang_for_deepl):
+    """Performs the actual (uncached) API request for ask_ai."""
     try:
         if provider == "OpenAI":
             if not openai_client: return "__ERROR__::OpenAI API Key not configured."
@@ -228,19 +586,19 @@ def ask_ai(prompt=None, original_text_for_deepl=None, target_lang_for_deepl=None
         elif provider == "DeepSeek":
             if not DEEPSEEK_API_KEY or "YOUR_DEEPSEEK_API_KEY" in DEEPSEEK_API_KEY:
                 return "__ERROR__::DeepSeek API Key not configured."
-            headers = {"Content-Type": "application/json", "Authorization": f"Bearer {DEEPSEEK_API_KEY}"}
-            payload = {"model": "deepseek-chat", "messages": [{"role": "user", "content": prompt}]}
-            r = requests.post("https://api.deepseek.com/v1/chat/completions", headers=headers, data=json.dumps(payload), timeout=30)
-            r.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            response_json = r.json()
-            if "choices" in response_json and response_json["choices"]:
-                return response_json["choices"][0]["message"]["content"]
-            else: return f"__ERROR__::DeepSeek returned unexpected response: {response_json}"
+            return deepseek_chat(prompt)
 
         elif provider == "DeepL":
             if not deepl_translator: return "__ERROR__::DeepL API Key not configured."
             # DeepL requires specific text and language codes, not a general prompt.
             if target_lang_for_deepl and original_text_for_deepl:
+                if isinstance(original_text_for_deepl, list): # Batched request: one result per input text
+                    translated = []
+                    for i, batch in enumerate(split_deepl_batch(original_text_for_deepl)):
+                        if i: wait_for_rate_limit("DeepL") # ask_ai only paced the first sub-batch
+                        translated.extend(r.text for r in deepl_translator.translate_text(
+                            batch, source_lang=source_lang_for_deepl, target_lang=target_lang_for_deepl))
+                    return {"translated": translated, "rephrased": None}
                 result = deepl_translator.translate_text(
                     original_text_for_deepl,
                     source_lang=source_lang_for_deepl, # Can be None for auto-detect
@@ -265,30 +623,53 @@ def ask_ai(prompt=None, original_text_for_deepl=None, target_lang_for_deepl=None
         return f"__ERROR__::Network error connecting to {provider}: {str(e)}"
     except Exception as e:
         # Catch any other unexpected errors
-        traceback.print_exc() # Log the full traceback for debugging
+        log_error(f"Unexpected {provider} API error: {type(e).__name__}: {e}") # Full traceback via the log writer
         return f"__ERROR__::An unexpected error occurred ({type(e).__name__}): {str(e)}"
 
 
 # --- Configuration File Handling ---
 def prettify_xml(elem):
-    """Returns a pretty-printed XML string for the Element."""
+    """Returns a pretty-printed XML document (bytes, with declaration) for the Element."""
     try:
-        rough_string = ET.tostring(elem, 'utf-8')
-        reparsed = minidom.parseString(rough_string)
-        # Use toprettyxml for indentation, decode, then clean up empty lines
-        pretty_xml_bytes = reparsed.toprettyxml(indent="  ", encoding='utf-8')
-        pretty_xml_str = pretty_xml_bytes.decode('utf-8')
-        lines = pretty_xml_str.splitlines()
-        non_empty_lines = [line for line in lines if line.strip()]
-        cleaned_xml_str = "\n".join(non_empty_lines)
-        return cleaned_xml_str.encode('utf-8')
+        # Indent the tree in place and serialise in a single pass (no DOM re-parse)
+        ET.indent(elem, space="  ")
+        return ET.tostring(elem, encoding='utf-8', xml_declaration=True)
     except Exception:
         # Fallback to basic tostring if prettify fails
         return ET.tostring(elem, 'utf-8')
+
+def write_file_atomic(path, data):
+    """
+    Writes bytes to path via a temporary sibling file and os.replace, so an
+    interrupted write never leaves a truncated or half-written file behind.
+    """
+    write_file_atomic_stream(path, lambda f: f.write(data))
+
+def write_file_atomic_stream(path, write, buffering=-1):
+    """
+    Like write_file_atomic, but write(f) streams the content into the open binary
+    temporary file itself (no need to build the whole document in memory first).
+    """
+    tmp_path = path + ".tmp"
+    replaced = False
+    try:
+        with open(tmp_path, "wb", buffering=buffering) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path) # Atomic on both POSIX and Windows
+        replaced = True
+    finally:
+        if not replaced: # Failed or interrupted: do not leave the temporary file behind
+            try: os.remove(tmp_path)
+            except OSError: pass
+
 # --- Context Menu Helper ---
 def add_text_widget_context_menu(text_widget):
-    """Adds a standard Copy/Cut/Paste/Select All context menu to a tk.Text widget."""
-    context_menu = tk.Menu(text_widget, tearoff=0)
+    """
+    Adds a standard Copy/Cut/Paste/Select All context menu to a tk.Text widget.
+    The tk.Menu itself is only built on the first right-click, not at GUI construction.
+    """
 
     def copy_action(event=None):
         if text_widget.tag_ranges(tk.SEL): text_widget.event_generate("<<Copy>>")
@@ -304,13 +685,18 @@ def add_text_widget_context_menu(text_widget):
     def select_all_action(event=None):
         text_widget.tag_add(tk.SEL, "1.0", tk.END); text_widget.focus_set(); return "break"
 
-    context_menu.add_command(label="Cut", command=cut_action)
-    context_menu.add_command(label="Copy", command=copy_action)
-    context_menu.add_command(label="Paste", command=paste_action)
-    context_menu.add_separator()
-    context_menu.add_command(label="Select All", command=select_all_action)
+    def build_context_menu():
+        context_menu = tk.Menu(text_widget, tearoff=0)
+        context_menu.add_command(label="Cut", command=cut_action)
+        context_menu.add_command(label="Copy", command=copy_action)
+        context_menu.add_command(label="Paste", command=paste_action)
+        context_menu.add_separator()
+        context_menu.add_command(label="Select All", command=select_all_action)
+        text_widget._ctx_menu = context_menu # Reused by every later right-click
+        return context_menu
 
     def show_popup_menu(event):
+        context_menu = getattr(text_widget, '_ctx_menu', None) or build_context_menu()
         # Update menu state based on selection and clipboard
         try:
             has_selection = bool(text_widget.tag_ranges(tk.SEL))
@@ -339,29 +725,28 @@ def add_text_widget_context_menu(text_widget):
 def create_default_config():
     """Creates a default config.xml file if it doesn't exist."""
     print(f"Creating default configuration file: {CONFIG_FILE}")
-    with config_lock:
-        try:
-            root = ET.Element('config')
-            api_keys_elem = ET.SubElement(root, 'api_keys')
-            ET.SubElement(api_keys_elem, 'openai').text = "YOUR_OPENAI_KEY_HERE"
-            ET.SubElement(api_keys_elem, 'deepseek').text = "YOUR_DEEPSEEK_KEY_HERE"
-            ET.SubElement(api_keys_elem, 'deepl').text = "YOUR_DEEPL_KEY_HERE" 
-            xml_bytes = prettify_xml(root)
-            with open(CONFIG_FILE, "wb") as f:
-                f.write(xml_bytes)
-            print(f"Default config file '{CONFIG_FILE}' created. Please edit it with your API keys.")
-            # Inform user via messagebox
-            messagebox.showinfo("Config File Created",
-                                f"'{CONFIG_FILE}' created.\nPlease add your API keys and use 'Reload Config & Keys' from the tray menu.",
-                                icon='info')
-        except Exception as e:
-            print(f"Error creating default config file: {e}")
-            traceback.print_exc()
-            messagebox.showerror("Config Error", f"Could not create default config file:\n{e}")
+    try:
+        root = ET.Element('config')
+        api_keys_elem = ET.SubElement(root, 'api_keys')
+        ET.SubElement(api_keys_elem, 'openai').text = "YOUR_OPENAI_KEY_HERE"
+        ET.SubElement(api_keys_elem, 'deepseek').text = "YOUR_DEEPSEEK_KEY_HERE"
+        ET.SubElement(api_keys_elem, 'deepl').text = "YOUR_DEEPL_KEY_HERE" 
+        xml_bytes = prettify_xml(root)
+        with config_lock:
+            write_file_atomic(CONFIG_FILE, xml_bytes)
+        print(f"Default config file '{CONFIG_FILE}' created. Please edit it with your API keys.")
+        # Inform user via messagebox
+        messagebox.showinfo("Config File Created",
+                            f"'{CONFIG_FILE}' created.\nPlease add your API keys and use 'Reload Config & Keys' from the tray menu.",
+                            icon='info')
+    except Exception as e:
+        print(f"Error creating default config file: {e}")
+        traceback.print_exc()
+        messagebox.showerror("Config Error", f"Could not create default config file:\n{e}")
 
 def load_api_keys():
     """Loads API keys from the config.xml file into global variables."""
-    global OPENAI_API_KEY, DEEPSEEK_API_KEY, DEEPL_API_KEY
+    global OPENAI_API_KEY, DEEPSEEK_API_KEY, DEEPL_API_KEY, _config_mtime
     loaded_keys_count = 0
     if not os.path.exists(CONFIG_FILE):
         create_default_config() # Create if missing
@@ -371,19 +756,25 @@ def load_api_keys():
     print(f"Loading API keys from {CONFIG_FILE}...")
     with config_lock:
         try:
-            tree = ET.parse(CONFIG_FILE)
-            root = tree.getroot()
-            keys_root = root.find('api_keys')
-            if keys_root is None:
+            # Stream the file and stop as soon as <api_keys> is complete
+            keys = {"openai": "", "deepseek": "", "deepl": ""}
+            found_keys_root = False
+            _config_mtime = os.path.getmtime(CONFIG_FILE)
+            with open(CONFIG_FILE, "rb") as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if elem.tag == 'api_keys':
+                        if event == 'end': break
+                        found_keys_root = True
+                    elif event == 'end' and found_keys_root and elem.tag in keys:
+                        keys[elem.tag] = (elem.text or "").strip()
+            if not found_keys_root:
                 print(f"Warning: <api_keys> tag not found in {CONFIG_FILE}. Recreating default.")
                 create_default_config() # Recreate if malformed
                 OPENAI_API_KEY, DEEPSEEK_API_KEY, DEEPL_API_KEY = None, None, None
                 return loaded_keys_count
 
             # Load keys, check if they are placeholders
-            openai_key = keys_root.findtext('openai', default="").strip()
-            deepseek_key = keys_root.findtext('deepseek', default="").strip()
-            deepl_key = keys_root.findtext('deepl', default="").strip()
+            openai_key, deepseek_key, deepl_key = keys["openai"], keys["deepseek"], keys["deepl"]
 
             if openai_key and "YOUR_OPENAI_KEY_HERE" not in openai_key:
                 OPENAI_API_KEY = openai_key; loaded_keys_count += 1
@@ -426,14 +817,45 @@ def reinitialize_clients():
     else: openai_client = None; print("  - OpenAI client set to None (no key).")
     # DeepL
     if DEEPL_API_KEY:
-        try: deepl_translator = deepl.Translator(DEEPL_API_KEY); print("  - DeepL translator re-initialised.")
+        try:
+            deepl_translator = deepl.Translator(DEEPL_API_KEY, send_platform_info=False); print("  - DeepL translator re-initialised.")
+            # Warm up the connection (and verify the key) so the first translation skips the TLS handshake
+            threading.Thread(target=warm_up_deepl, args=(deepl_translator,), daemon=True, name="DeepL-WarmUp").start()
         except ImportError: print("  - Error: 'deepl' library not found."); deepl_translator = None
         except Exception as e: print(f"  - Failed re-init DeepL: {e}"); deepl_translator = None
     else: deepl_translator = None; print("  - DeepL translator set to None (no key).")
 
+def apply_startup_clients():
+    """
+    Brings the GUI in line with the API clients once the startup client init has finished
+    (it runs while show_gui builds the widgets). Selects the provider show_gui would have
+    defaulted to had the clients been ready, so startup behaves as if it ran sequentially.
+    """
+    configured = [name for name, ready in (("DeepL", deepl_translator), ("DeepSeek", DEEPSEEK_API_KEY), ("OpenAI", openai_client)) if ready]
+    if not api_provider_var: return
+    if configured and api_provider_var.get() != configured[0]:
+        api_provider_var.set(configured[0]) # The trace refreshes the dropdowns and languages
+    else:
+        update_gui_after_reload()
+
+def warm_up_deepl(translator):
+    """
+    Issues a cheap get_usage() request on a new DeepL translator. This opens the HTTPS
+    connection ahead of the first translation and stores the quota in deepl_usage.
+    """
+    global deepl_usage
+    try:
+        usage = translator.get_usage()
+    except Exception as e:
+        print(f"  - DeepL warm-up failed: {e}")
+        return
+    if translator is not deepl_translator: return # Replaced by a reload meanwhile
+    deepl_usage = usage
+    if usage.character.valid:
+        print(f"  - DeepL usage: {usage.character.count:,} of {usage.character.limit:,} characters.")
+
 def update_gui_after_reload():
     """Updates the GUI elements (API dropdown, language lists) after config reload."""
-    global api_dropdown, api_provider_var, window, target_language_var, source_language_var, source_language_dropdown, target_language_dropdown
     if not all([window, window.winfo_exists(), api_dropdown, api_provider_var,
                 target_language_var, source_language_var, source_language_dropdown,
                 target_language_dropdown]):
@@ -473,12 +895,13 @@ def update_gui_after_reload():
 
     # Update language dropdowns based on the selected provider
     provider = api_provider_var.get()
-    lang_keys = list(supported_languages.get(provider, {}).keys())
+    lang_keys = _lang_values_cache.get(provider, ())
 
     if lang_keys:
-        # Set default languages if provider changed or was invalid
-        if source_language_var.get() not in lang_keys: source_language_var.set("English")
-        if target_language_var.get() not in lang_keys: target_language_var.set("Turkish")
+        # Set default languages if provider changed or was invalid (dict membership, not a tuple scan)
+        provider_langs = supported_languages[provider]
+        if source_language_var.get() not in provider_langs: source_language_var.set("English")
+        if target_language_var.get() not in provider_langs: target_language_var.set("Turkish")
         source_language_dropdown['values'] = lang_keys
         target_language_dropdown['values'] = lang_keys
         source_language_dropdown.config(state="readonly")
@@ -487,8 +910,8 @@ def update_gui_after_reload():
         # No languages for this provider (or "No APIs")
         source_language_var.set("")
         target_language_var.set("")
-        source_language_dropdown['values'] = []
-        target_language_dropdown['values'] = []
+        source_language_dropdown['values'] = ()
+        target_language_dropdown['values'] = ()
         source_language_dropdown.config(state="disabled")
         target_language_dropdown.config(state="disabled")
 
@@ -501,36 +924,37 @@ def reload_config_and_clients():
     keys_loaded = load_api_keys()
     reinitialize_clients()
     if window:
-        # Schedule GUI update on the main thread
+        # Schedule GUI update and a non-blocking confirmation on the main thread
         window.after(0, update_gui_after_reload)
-    messagebox.showinfo("Reload Complete", f"{keys_loaded} API key(s) reloaded.\nAPI list and clients updated.", icon='info')
+        window.after(0, show_status, "Reload Complete", f"{keys_loaded} API key(s) reloaded. API list and clients updated.")
+    else:
+        messagebox.showinfo("Reload Complete", f"{keys_loaded} API key(s) reloaded.\nAPI list and clients updated.", icon='info')
     print("Reload process finished.\n" + "-" * 60)
 
 def save_api_keys_to_xml(openai_key, deepseek_key, deepl_key):
     """Saves the provided API keys to the config.xml file."""
     print(f"Saving API keys to {CONFIG_FILE}...")
-    with config_lock:
-        try:
-            root = ET.Element('config')
-            api_keys_elem = ET.SubElement(root, 'api_keys')
-            # Use placeholders if keys are empty
-            ET.SubElement(api_keys_elem, 'openai').text = openai_key if openai_key and openai_key.strip() else "YOUR_OPENAI_KEY_HERE"
-            ET.SubElement(api_keys_elem, 'deepseek').text = deepseek_key if deepseek_key and deepseek_key.strip() else "YOUR_DEEPSEEK_KEY_HERE"
-            ET.SubElement(api_keys_elem, 'deepl').text = deepl_key if deepl_key and deepl_key.strip() else "YOUR_DEEPL_KEY_HERE_OR_FREE_KEY:fx"
-            xml_bytes = prettify_xml(root)
-            with open(CONFIG_FILE, "wb") as f:
-                f.write(xml_bytes)
-            print(f"API Keys successfully saved to {CONFIG_FILE}")
-            return True
-        except Exception as e:
-            print(f"Error saving config file '{CONFIG_FILE}': {e}")
-            traceback.print_exc()
-            messagebox.showerror("Config Save Error", f"Could not save config file:\n{e}")
-            return False
+    try:
+        root = ET.Element('config')
+        api_keys_elem = ET.SubElement(root, 'api_keys')
+        # Use placeholders if keys are empty
+        ET.SubElement(api_keys_elem, 'openai').text = openai_key if openai_key and openai_key.strip() else "YOUR_OPENAI_KEY_HERE"
+        ET.SubElement(api_keys_elem, 'deepseek').text = deepseek_key if deepseek_key and deepseek_key.strip() else "YOUR_DEEPSEEK_KEY_HERE"
+        ET.SubElement(api_keys_elem, 'deepl').text = deepl_key if deepl_key and deepl_key.strip() else "YOUR_DEEPL_KEY_HERE_OR_FREE_KEY:fx"
+        xml_bytes = prettify_xml(root)
+        with config_lock: # Only the file swap needs the lock
+            write_file_atomic(CONFIG_FILE, xml_bytes)
+        print(f"API Keys successfully saved to {CONFIG_FILE}")
+        return True
+    except Exception as e:
+        print(f"Error saving config file '{CONFIG_FILE}': {e}")
+        traceback.print_exc()
+        messagebox.showerror("Config Save Error", f"Could not save config file:\n{e}")
+        return False
 
 def show_config_editor():
     """Displays the API Key Editor window."""
-    global config_window, OPENAI_API_KEY, DEEPSEEK_API_KEY, DEEPL_API_KEY
+    global config_window
 
     # Prevent multiple editor windows
     if config_window and config_window.winfo_exists():
@@ -540,7 +964,11 @@ def show_config_editor():
     else:
         config_window = None # Reset if previous window was closed
 
-    load_api_keys() # Load current keys to display
+    # The key globals are current unless config.xml was edited outside the app
+    try:
+        if os.path.getmtime(CONFIG_FILE) != _config_mtime: load_api_keys()
+    except OSError:
+        load_api_keys() # Missing file: recreate the default
 
     try:
         parent = window if window and window.winfo_exists() else None
@@ -621,47 +1049,93 @@ def show_config_editor():
 
 
 # --- History Management ---
+def history_sort_key(entry):
+    """
+    Sort key for history entries. Timestamps are zero-padded "%Y-%m-%d %H:%M:%S", so string
+    order is chronological order and no datetime parsing is needed. Malformed timestamps
+    simply sort as strings.
+    """
+    return entry.get("time") or ""
+
 def sort_history_data():
     """Sorts the global history_data list by timestamp (newest first)."""
-    global history_data
     try:
-        # Attempt to parse timestamp and sort
-        history_data.sort(key=lambda x: datetime.strptime(x.get("time", "1970-01-01 00:00:00"), "%Y-%m-%d %H:%M:%S"), reverse=True)
-    except ValueError as e:
-        # Handle potential parsing errors if timestamps are malformed
-        print(f"Error sorting history data due to invalid timestamp format: {e}")
-        # Optionally show a warning, but don't stop the application
-        # messagebox.showwarning("History Sort Warning", f"Could not sort some history entries due to invalid date format: {e}")
+        history_data.sort(key=history_sort_key, reverse=True)
     except Exception as e:
         print(f"Unexpected error sorting history data: {e}")
         # messagebox.showerror("History Sort Error", f"Failed to sort history: {e}")
 
+def ensure_history_dir():
+    """Creates the directory of HISTORY_FILE on the first save of the run; later saves skip the check."""
+    global _history_dir_ready
+    if not _history_dir_ready:
+        os.makedirs(os.path.dirname(HISTORY_FILE) or ".", exist_ok=True)
+        _history_dir_ready = True
+
+def build_history_item(entry, parent):
+    """Builds the <item> element for a history entry as a child of parent."""
+    item = ET.SubElement(parent, "item")
+    for key, value in entry.items():
+        # Ensure values are strings for XML
+        ET.SubElement(item, key).text = str(value) if value is not None else ""
+    return item
+
+def append_history_entries(entries):
+    """
+    Appends entries to HISTORY_FILE in place: the closing </history> tag is overwritten
+    with the new <item> elements followed by a fresh closing tag, so the cost does not
+    grow with the size of the history.
+
+    Returns:
+        bool: False if the file is missing or does not end with </history> (e.g. an empty
+              '<history />'), in which case the caller should do a full save instead.
+    """
+    if not entries:
+        return True
+    # Fixed fields, so format them directly instead of building and serialising an Element tree.
+    # A missing field is written empty (the loader reads it as "" either way) instead of raising.
+    chunks = []
+    for entry in entries:
+        fields = {key: entry.get(key) for key in _REQUIRED_FIELDS}
+        chunks.append(_HISTORY_ITEM_TEMPLATE.format_map(
+            {key: xml_escape(str(value)) if value is not None else "" for key, value in fields.items()}
+        ).encode("utf-8"))
+    try:
+        with open(HISTORY_FILE, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_start = max(0, size - 64)
+            f.seek(tail_start)
+            tail = f.read()
+            close_pos = tail.rfind(_HISTORY_CLOSE_TAG)
+            if close_pos < 0 or tail[close_pos + len(_HISTORY_CLOSE_TAG):].strip():
+                return False
+            f.seek(tail_start + close_pos)
+            f.write(b"".join(chunks) + _HISTORY_CLOSE_TAG)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+    except FileNotFoundError:
+        return False
+
 def save_history_to_xml(history_data_to_save):
     """Saves the provided history data list to the HISTORY_FILE (XML format)."""
     # Use a copy to avoid modifying the global list directly during iteration if needed later
     # history_copy = list(history_data_to_save) # Not strictly needed here
     try:
-        # Basic directory and permission checks
-        history_dir = os.path.dirname(HISTORY_FILE) or "."
-        os.makedirs(history_dir, exist_ok=True) # Ensure directory exists
-        if os.path.exists(HISTORY_FILE) and not os.access(HISTORY_FILE, os.W_OK):
-            raise PermissionError(f"No write permission for {HISTORY_FILE}")
+        ensure_history_dir()
 
         # Build XML structure
         root = ET.Element("history")
         for entry in history_data_to_save:
-            item = ET.SubElement(root, "item")
-            for key, value in entry.items():
-                child = ET.SubElement(item, key)
-                # Ensure values are strings for XML
-                child.text = str(value) if value is not None else ""
+            build_history_item(entry, root)
 
-        # Write prettified XML to file
-        xml_bytes = prettify_xml(root)
-        with open(HISTORY_FILE, "wb") as f:
-            # Write XML declaration explicitly
-            # f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n') # prettify_xml handles this
-            f.write(xml_bytes)
+        # Indent in place and stream through a 64 KB buffer into a temp file, then swap it in
+        # atomically so an interrupted save never truncates the existing history
+        ET.indent(root, space="  ")
+        write_file_atomic_stream(HISTORY_FILE,
+                                 lambda f: ET.ElementTree(root).write(f, encoding="UTF-8", xml_declaration=True),
+                                 buffering=65536)
 
         # Sanity check if file was created (optional)
         # if not os.path.exists(HISTORY_FILE):
@@ -669,15 +1143,147 @@ def save_history_to_xml(history_data_to_save):
 
     except PermissionError as e:
         print(f"Permission error saving history: {e}")
-        messagebox.showerror("History Save Error", f"Permission error writing to '{HISTORY_FILE}':\n{e}")
+        report_history_save_error(f"Permission error writing to '{HISTORY_FILE}':\n{e}")
     except Exception as e:
         print(f"Error saving history: {e}")
         traceback.print_exc()
-        messagebox.showerror("History Save Error", f"Failed to save history to '{HISTORY_FILE}':\n{e}")
+        report_history_save_error(f"Failed to save history to '{HISTORY_FILE}':\n{e}")
+
+def report_history_save_error(message):
+    """
+    Reports a failed history save from any thread (saves run on the flusher thread and at
+    exit): as a dialog on the Tk main thread while the GUI runs, otherwise to the error log.
+    """
+    if window is not None and not _exiting.is_set():
+        post_to_gui(messagebox.showerror, "History Save Error", message)
+    else:
+        log_error(f"History Save Error: {message}") # Window gone or going: no dialog to show
+
+def iter_history_items(filepath):
+    """
+    Incrementally parses a history XML file and yields one entry dict per valid <item>.
+    Items are discarded from the partial tree as soon as they are read, so memory stays
+    bounded by a single item regardless of the file size.
+
+    Raises:
+        ValueError: If the root tag is not 'history'.
+        ET.ParseError: If the file is not well-formed XML.
+    """
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(filepath, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+                if root.tag != 'history':
+                    raise ValueError(f"Invalid root tag '{root.tag}' in file '{os.path.basename(filepath)}'. Expected 'history'.")
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1 or elem.tag != 'item':
+            continue # Only direct <item> children of <history> are entries
+        entry = {field: elem.findtext(field) or "" for field in _REQUIRED_FIELDS}
+        root.clear() # Drop the finished item (and any earlier siblings) from memory
+        if entry['time']: # Skip entries without a time
+            yield entry
+
+def insert_history_sorted(entry):
+    """
+    Inserts entry into the newest-first history_data list at its sorted position, after any
+    entries with the same timestamp (same placement as append + stable sort). Uses a binary
+    search because bisect only handles ascending order. New entries normally land at index 0,
+    which is checked first.
+    """
+    key = history_sort_key(entry)
+    if not history_data or key > history_sort_key(history_data[0]):
+        history_data.insert(0, entry) # Common case: the new entry is the newest one
+        return
+    lo, hi = 0, len(history_data)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if history_sort_key(history_data[mid]) < key: hi = mid
+        else: lo = mid + 1
+    history_data.insert(lo, entry)
+
+def history_entry_key(entry):
+    """
+    Identity of a history entry for duplicate detection. The timestamp alone only has
+    one-second resolution, so different translations made in the same second would collide.
+    """
+    return (entry.get("time"), entry.get("provider"), entry.get("original"), entry.get("translated"))
+
+def ensure_history_loaded():
+    """Waits until the background startup load of the history has finished (no-op afterwards)."""
+    _history_loaded.wait()
+
+def add_history_entry(entry):
+    """
+    Adds a new entry to history_data and queues it for the background flusher, which
+    appends it to HISTORY_FILE without rewriting the rest of the file.
+
+    Returns:
+        bool: False if an identical entry (see history_entry_key) is already in the history.
+    """
+    ensure_history_loaded() # The loader replaces history_data, so never insert before it is done
+    key = history_entry_key(entry)
+    with history_data_lock:
+        if key in _history_keys:
+            return False # Exact re-submission within the same second
+        _history_keys.add(key)
+        insert_history_sorted(entry)
+        _history_pending.append(entry)
+    _history_dirty.set()
+    return True
+
+def mark_history_dirty():
+    """
+    Flags history_data as changed in a way that needs a full rewrite (merge, clear).
+    The background flusher writes it to disk after HISTORY_FLUSH_DELAY seconds, so a
+    burst of changes costs a single file write.
+    """
+    global _history_needs_rewrite
+    with history_data_lock:
+        _history_needs_rewrite = True
+    _history_dirty.set()
+
+def flush_history():
+    """Writes pending history changes to HISTORY_FILE now, appending when possible."""
+    global _history_needs_rewrite
+    with history_lock:
+        if not _history_dirty.is_set():
+            return
+        # Clear before taking the snapshot: changes made during the write re-flag it
+        _history_dirty.clear()
+        with history_data_lock:
+            pending = list(_history_pending)
+            _history_pending.clear()
+            needs_rewrite = _history_needs_rewrite
+            _history_needs_rewrite = False
+            snapshot = list(history_data) if needs_rewrite else None
+        if needs_rewrite:
+            save_history_to_xml(snapshot)
+            return
+        try:
+            appended = append_history_entries(pending)
+        except Exception as e:
+            print(f"Error appending to history file, rewriting it instead: {e}")
+            appended = False
+        if not appended:
+            with history_data_lock:
+                snapshot = list(history_data)
+            save_history_to_xml(snapshot)
+
+def history_flush_loop():
+    """Background loop that flushes pending history changes (runs in a daemon thread)."""
+    while True:
+        _history_dirty.wait()
+        time.sleep(HISTORY_FLUSH_DELAY) # Let further changes accumulate
+        try: flush_history()
+        except Exception as e: print(f"Error flushing history: {e}"); traceback.print_exc()
 
 def load_history_from_path(filepath):
     """Loads history entries from a specified XML file path."""
-    loaded_entries = []
     if not filepath:
         return False, "No file path provided.", []
     if not os.path.exists(filepath):
@@ -685,27 +1291,12 @@ def load_history_from_path(filepath):
 
     try:
         with history_lock: # Use lock for file access
-            tree = ET.parse(filepath)
-            root = tree.getroot()
-            if root.tag != 'history':
-                errmsg = f"Invalid root tag '{root.tag}' in file '{os.path.basename(filepath)}'. Expected 'history'."
-                return False, errmsg, []
-
-            required_fields = ['time', 'provider', 'original', 'translated', 'rephrased', 'target_language']
-            for entry_elem in root.findall('item'):
-                entry = {}
-                valid_entry = True
-                for field in required_fields:
-                    child = entry_elem.find(field)
-                    entry[field] = child.text if child is not None and child.text is not None else ""
-                    # Basic validation (e.g., check if time exists)
-                    if field == 'time' and not entry[field]:
-                         valid_entry = False; break # Skip entries without a time
-                if valid_entry:
-                    loaded_entries.append(entry)
+            loaded_entries = list(iter_history_items(filepath))
 
         return True, f"Read {len(loaded_entries)} valid entries from\n{os.path.basename(filepath)}", loaded_entries
 
+    except ValueError as e:
+        return False, str(e), []
     except ET.ParseError as e:
         errmsg = f"Error parsing XML file '{os.path.basename(filepath)}': {e}"
         return False, errmsg, []
@@ -715,45 +1306,43 @@ def load_history_from_path(filepath):
         return False, f"An unexpected error occurred:\n{e}", []
 
 def load_history_from_xml():
-    """Loads history from the default HISTORY_FILE into the global history_data."""
+    """
+    Loads history from the default HISTORY_FILE into the global history_data.
+    Runs on a background thread at startup; ensure_history_loaded() waits for it.
+    """
+    try:
+        _load_history_file()
+    finally:
+        _history_loaded.set() # Also on errors, so waiters never block forever
+
+def _load_history_file():
+    """Does the actual parsing for load_history_from_xml."""
     global history_data
     history_data = [] # Clear existing in-memory history first
+    _history_keys.clear()
     if not os.path.exists(HISTORY_FILE):
         return # Nothing to load
 
     try:
         with history_lock: # Use lock for file access
-            tree = ET.parse(HISTORY_FILE)
-            root = tree.getroot()
-            if root.tag != 'history':
-                 print(f"Warning: Root tag in {HISTORY_FILE} is not 'history'. Skipping load.")
-                 return
-
-            required_fields = ['time', 'provider', 'original', 'translated', 'rephrased', 'target_language']
-            for item in root.findall("item"):
-                entry = {}
-                valid_entry = True
-                for field in required_fields:
-                    child = item.find(field)
-                    entry[field] = child.text if child is not None and child.text is not None else ""
-                    if field == 'time' and not entry[field]:
-                        valid_entry = False; break # Skip entries without time
-                if valid_entry:
-                    history_data.append(entry)
+            # Collect into a local list first so a parse error part-way leaves history empty
+            history_data = list(iter_history_items(HISTORY_FILE))
 
         sort_history_data() # Sort loaded data
+        _history_keys.update(map(history_entry_key, history_data))
 
+    except ValueError:
+        print(f"Warning: Root tag in {HISTORY_FILE} is not 'history'. Skipping load.")
     except ET.ParseError as e:
         print(f"Error parsing history file {HISTORY_FILE}: {e}")
-        messagebox.showerror("History Load Error", f"Failed to parse history file:\n{e}\nHistory might be corrupted.")
+        post_to_gui(messagebox.showerror, "History Load Error", f"Failed to parse history file:\n{e}\nHistory might be corrupted.")
     except Exception as e:
         print(f"Error loading history: {e}")
         traceback.print_exc()
-        messagebox.showerror("History Load Error", f"Failed to load history from '{HISTORY_FILE}':\n{e}")
+        post_to_gui(messagebox.showerror, "History Load Error", f"Failed to load history from '{HISTORY_FILE}':\n{e}")
 
 def prompt_and_load_history():
     """Prompts the user to select an XML file and merges its content into the current history."""
-    global history_data, history_window
 
     initial_dir = os.path.dirname(os.path.abspath(HISTORY_FILE)) if os.path.exists(HISTORY_FILE) else os.getcwd()
     filepath = filedialog.askopenfilename(
@@ -769,17 +1358,24 @@ def prompt_and_load_history():
             messagebox.showinfo("Load History", f"No valid history entries found in\n{os.path.basename(filepath)}")
             return
 
-        # Merge loaded entries with existing data, avoiding duplicates based on timestamp
-        existing_times = {entry.get('time') for entry in history_data if entry.get('time')}
-        unique_new_entries = [entry for entry in loaded_entries if entry.get('time') not in existing_times]
+        # Merge loaded entries with existing data, skipping entries that are already present
+        unique_new_entries = []
+        ensure_history_loaded()
+        with history_data_lock:
+            for entry in loaded_entries:
+                key = history_entry_key(entry)
+                if key not in _history_keys:
+                    _history_keys.add(key); unique_new_entries.append(entry)
+            if unique_new_entries:
+                # Both lists are newest-first, so a single linear merge replaces extend + re-sort
+                unique_new_entries.sort(key=history_sort_key, reverse=True)
+                history_data[:] = heapq.merge(history_data, unique_new_entries, key=history_sort_key, reverse=True)
 
         if not unique_new_entries:
              messagebox.showinfo("History Merge", f"All {len(loaded_entries)} entries from\n{os.path.basename(filepath)}\nalready exist in the current history.")
              return
 
-        history_data.extend(unique_new_entries)
-        sort_history_data()
-        save_history_to_xml(history_data) # Save the merged history
+        mark_history_dirty() # The merged history is saved by the background flusher
 
         # Update the history window if it's open
         if history_window and history_window.winfo_exists():
@@ -792,25 +1388,36 @@ def prompt_and_load_history():
 
 def backup_and_clear_history():
     """Backs up the current history file and clears the history."""
-    global history_data, history_window
 
     backup_filename = ""
     backup_made = False
+    ensure_history_loaded() # A load finishing after the clear would bring the old entries back
+    flush_history() # Make sure pending entries end up in the backup
     if os.path.exists(HISTORY_FILE):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"translation_history_{timestamp}.xml"
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        # Next to the history file, so the backup is a plain rename on the same filesystem
+        backup_filename = os.path.join(os.path.dirname(HISTORY_FILE), f"translation_history_{timestamp}.xml")
         with history_lock:
             try:
-                shutil.move(HISTORY_FILE, backup_filename)
+                try:
+                    os.replace(HISTORY_FILE, backup_filename) # Atomic and constant-time
+                except OSError as e_move:
+                    if e_move.errno != errno.EXDEV: raise
+                    # Rename refused across filesystems: fall back to copy, then remove
+                    shutil.copy2(HISTORY_FILE, backup_filename)
+                    os.remove(HISTORY_FILE)
                 backup_made = True
             except Exception as e:
                 messagebox.showerror("History Backup Error", f"Could not backup '{HISTORY_FILE}' to '{backup_filename}':\n{e}")
                 traceback.print_exc()
                 return # Stop if backup failed
 
-    # Clear in-memory data and save empty file
-    history_data.clear()
-    save_history_to_xml([]) # Save empty history
+    # Clear in-memory data (and anything still waiting to be appended) and save empty file
+    with history_data_lock:
+        history_data.clear()
+        _history_keys.clear()
+        _history_pending.clear()
+    mark_history_dirty() # The background flusher saves the empty history
 
     # Update the history window if it's open
     if history_window and history_window.winfo_exists():
@@ -823,7 +1430,7 @@ def backup_and_clear_history():
 
 
 # --- Core Logic: Processing API Results and Updating GUI ---
-def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False):
+def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False, request_key=None):
     """
     Processes the result from the API, updates the GUI text boxes,
     and saves an entry to the history.
@@ -837,16 +1444,17 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
                                   String for LLMs or __ERROR__, Dict for DeepL success.
         is_rephrase (bool): True if this is the result of a 'Rephrase Again' action (LLM only).
         is_reverse (bool): True if this is the result of a 'Translate Back' action.
+        request_key (int, optional): clipboard_request_key of a forward translation; remembered
+                                     on success so the hotkey can skip re-translating the same text.
     """
-    global last_selected_text, last_translation, history_data
-    global original_textbox, translated_textbox, rephrased_textbox
-    global last_history_source_language, last_history_target_language # Set before calling API
-    provider = api_provider_var.get() if api_provider_var else "N/A"
+    global last_selected_text, last_translation, _last_clipboard_key
+    provider = get_selected_provider("N/A")
 
     try:
         # --- Handle API Errors First ---
         if isinstance(full_result, str) and full_result.startswith("__ERROR__::"):
             error_msg = full_result.replace("__ERROR__::", "")
+            _last_clipboard_key = None # Let the hotkey retry the same text
             messagebox.showerror("API Error", error_msg)
             # Do not proceed further, but update button states
             update_button_states(action_was_tr_to_en=is_reverse)
@@ -871,6 +1479,7 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
             gui_original = history_translated
             gui_translated = history_original
             gui_rephrased = "" # Clear rephrase box
+            _last_clipboard_key = None # The boxes no longer show a forward translation
 
         # B. Rephrase Again Result (LLM Only)
         elif is_rephrase:
@@ -878,7 +1487,7 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
             processed_rephrase_result = str(full_result)
             # Clean extra newlines from DeepSeek if needed (though called by LLM now)
             if provider == "DeepSeek":
-                 processed_rephrase_result = re.sub(r'\n\s*\n', '\n', processed_rephrase_result.strip())
+                 processed_rephrase_result = _BLANK_LINES_RE.sub('\n', processed_rephrase_result.strip())
 
             history_original = text_passed      # Original source text (last_selected_text)
             history_translated = last_translation # Keep the previous translation
@@ -901,21 +1510,15 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
 
             # C2. LLM Forward Translation (result is string)
             elif provider != "DeepL" and isinstance(full_result, str):
-                 # Parse the "Translation: ... Rephrased: ..." format
-                 lines = full_result.strip().split("\n")
-                 tr_keyword = f"{last_history_target_language} Translation:"
-                 rep_keyword = f"{last_history_source_language} Rephrased:"
-                 found_tr, found_rep, cur_section = False, False, None
-                 trans_parts, rep_parts = [], []
-                 for line in lines:
-                     l = line.strip()
-                     if not l: continue # Skip empty lines
-                     if l.startswith(tr_keyword) and not found_tr: found_tr=True; cur_section="trans"; trans_parts.append(l[len(tr_keyword):].strip())
-                     elif l.startswith(rep_keyword) and found_tr and not found_rep: found_rep=True; cur_section="rep"; rep_parts.append(l[len(rep_keyword):].strip())
-                     elif cur_section == "trans": trans_parts.append(l)
-                     elif cur_section == "rep": rep_parts.append(l)
-                 history_translated = "\n".join(trans_parts).strip() if found_tr else "[Translation not found in LLM response]"
-                 history_rephrased = "\n".join(rep_parts).strip() if found_rep else "[Rephrasing not found in LLM response]"
+                 # Parse the "Translation: ... Rephrased: ..." format in a single regex scan
+                 match = llm_response_pattern(last_history_target_language, last_history_source_language).search(full_result.strip())
+                 if match:
+                     history_translated = _LINE_BREAK_WS_RE.sub("\n", match.group(1).strip())
+                     history_rephrased = (_LINE_BREAK_WS_RE.sub("\n", match.group(2).strip())
+                                          if match.group(2) is not None else "[Rephrasing not found in LLM response]")
+                 else: # No line starts with the translation keyword
+                     history_translated = "[Translation not found in LLM response]"
+                     history_rephrased = "[Rephrasing not found in LLM response]"
                  last_translation = history_translated
 
             # C3. Unexpected Format for Forward Translation
@@ -931,11 +1534,13 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
             # Update last_selected_text ONLY on successful forward translation
             if history_translated and not history_translated.startswith("["):
                  last_selected_text = history_original
-            #else: # Keep the previous last_selected_text if translation failed
+                 _last_clipboard_key = request_key
+            else: # Keep the previous last_selected_text if translation failed
+                 _last_clipboard_key = None
 
 
         # --- Save to History ---
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ts = time.strftime(HISTORY_TIME_FORMAT)
         new_history_entry = {
             "time": ts,
             "original": history_original,
@@ -944,13 +1549,7 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
             "provider": provider, # Consider adding '(Rephrase)' tag here if is_rephrase? No, handled in rephrase_again.
             "target_language": f"{last_history_source_language} -> {last_history_target_language}"
         }
-        history_data.append(new_history_entry)
-        sort_history_data()
-        try:
-            save_history_to_xml(history_data)
-        except Exception as e_hist:
-            # Avoid showing messagebox here if save_history_to_xml already does
-            print(f"Error saving history via update_result: {e_hist}")
+        add_history_entry(new_history_entry) # Appended to the file by the background flusher
 
 
         # --- Update GUI Text Boxes ---
@@ -958,9 +1557,9 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
              """Helper function to update a text box safely."""
              if box and box.winfo_exists():
                   try:
-                       box.config(state='normal'); box.delete("1.0", tk.END)
-                       if text: box.insert(tk.END, text)
                        box.config(state='normal')
+                       box.replace("1.0", tk.END, text or "") # One Tcl call instead of delete + insert
+                       box.edit_reset() # New result: earlier contents are not undoable
                   except tk.TclError: pass # Ignore if widget is destroyed
                   except Exception as e_update: print(f"Unexpected error updating textbox: {e_update}"); traceback.print_exc()
 
@@ -976,6 +1575,7 @@ def update_result(text_passed, full_result, is_rephrase=False, is_reverse=False)
         # Catch unexpected errors during result processing
         print(f"--- FATAL ERROR in update_result ---")
         traceback.print_exc()
+        _last_clipboard_key = None
         messagebox.showerror("Update Result Fatal Error", f"An critical error occurred processing the result: {str(e)}")
         # Attempt to update buttons even after error
         update_button_states(action_was_tr_to_en=is_reverse)
@@ -1003,16 +1603,18 @@ def run_translate_rephrase():
     If using DeepL, also performs automatic rephrasing via Target -> Source translation.
     If using LLM, the API is prompted to do both translation and rephrasing.
     """
-    global original_textbox, last_history_source_language, last_history_target_language, deepl_translator, window, api_provider_var, source_language_var, target_language_var
+    global last_history_source_language, last_history_target_language, _last_clipboard_key
 
     if not original_textbox: return
     text_to_process = original_textbox.get("1.0", tk.END).strip()
     if not text_to_process:
         messagebox.showwarning("Input Missing", "Please enter text in the Source Text area.")
         return
+    request_key = clipboard_request_key(text_to_process)
+    if request_key != _last_clipboard_key: _last_clipboard_key = None # Another text is being translated
 
     # Get current settings
-    provider = api_provider_var.get() if api_provider_var else "DeepL"
+    provider = get_selected_provider("DeepL")
     src_lang_display = source_language_var.get() if source_language_var else "English"
     tgt_lang_display = target_language_var.get() if target_language_var else "Turkish"
 
@@ -1034,12 +1636,13 @@ def run_translate_rephrase():
                 step1_source_lang_code = get_deepl_source_code(src_lang_display) # e.g., TR
                 step1_target_lang_code = get_deepl_target_code(tgt_lang_display) # e.g., EN-GB
 
-                # Step 1: Forward Translation
-                step1_result = deepl_translator.translate_text(
-                    text_to_process, source_lang=step1_source_lang_code, target_lang=step1_target_lang_code )
-                translated_text = step1_result.text # e.g., English text
+                # Step 1: Forward Translation (through ask_ai: cached and rate limited)
+                step1_result = ask_ai(None, text_to_process, step1_target_lang_code, step1_source_lang_code, provider="DeepL")
+                translated_text = step1_result.get("translated") if isinstance(step1_result, dict) else None # e.g., English text
 
-                if not translated_text:
+                if isinstance(step1_result, str): # __ERROR__:: string, shown by update_result
+                    final_result_for_update = step1_result
+                elif not translated_text:
                     final_result_for_update = { "translated": "[Translation Failed or Empty]", "rephrased": "[Rephrasing skipped]" }
                 else:
                     # Step 2: Back-Translation (Target -> Source) for Rephrase
@@ -1053,19 +1656,19 @@ def run_translate_rephrase():
                         step2_target_lang_code = get_deepl_target_code(src_lang_display) # e.g., TR
                         # === DEĞİŞİKLİK SONU ===
 
-                        step2_result = deepl_translator.translate_text(
-                            translated_text,            # Text from Step 1 (e.g., English)
-                            source_lang=step2_source_lang_code, # Correct source (e.g., EN)
-                            target_lang=step2_target_lang_code  # Correct target (e.g., TR)
-                        )
-                        rephrased_text = step2_result.text or "[Rephrasing resulted in empty text]"
-
-                    except deepl.DeepLException as e_rephrase:
-                         # Log the specific error but show a cleaner message in GUI
-                         print(f"DeepL Rephrase (Step 2) Error: {e_rephrase}")
-                         rephrased_text = f"[Rephrasing Error: {type(e_rephrase).__name__}]" # Show only exception type
+                        step2_result = ask_ai(None,
+                            translated_text,        # Text from Step 1 (e.g., English)
+                            step2_target_lang_code, # Correct target (e.g., TR)
+                            step2_source_lang_code, # Correct source (e.g., EN)
+                            provider="DeepL" )
+                        if isinstance(step2_result, dict):
+                            rephrased_text = step2_result.get("translated") or "[Rephrasing resulted in empty text]"
+                        else:
+                            # Log the specific error but show a cleaner message in GUI
+                            print(f"DeepL Rephrase (Step 2) Error: {step2_result.replace('__ERROR__::', '')}")
+                            rephrased_text = "[Rephrasing Error: DeepL API]"
                     except Exception as e_rephrase_other:
-                         print(f"Unexpected Step 2 Error: {e_rephrase_other}"); traceback.print_exc()
+                         log_error(f"Unexpected Step 2 Error: {e_rephrase_other}")
                          rephrased_text = f"[Unexpected Rephrasing Error]"
 
                     # Package results
@@ -1074,36 +1677,38 @@ def run_translate_rephrase():
             # B. LLM: Single prompt for Translate & Rephrase
             else: # OpenAI or DeepSeek
                 prompt_ = full_prompt(text_to_process, src_lang_display, tgt_lang_display)
-                final_result_for_update = ask_ai(prompt=prompt_)
+                # Cache only replies update_result can parse, so a retry of a bad reply asks again
+                response_pattern = llm_response_pattern(tgt_lang_display, src_lang_display)
+                final_result_for_update = ask_ai(prompt=prompt_,
+                                                 cache_if=lambda reply: isinstance(reply, str) and response_pattern.search(reply.strip()) is not None)
 
         # --- Exception Handling for API Call ---
         except deepl.DeepLException as e_deepl: final_result_for_update = f"__ERROR__::DeepL API Error: {e_deepl}"
         except ConnectionError as e_conn: final_result_for_update = f"__ERROR__::{e_conn}"
         except Exception as e:
              error_message = f"Error during Translate & Rephrase API call: {type(e).__name__}: {e}"
-             print(error_message); traceback.print_exc()
+             log_error(error_message)
              final_result_for_update = f"__ERROR__::{error_message}"
         finally:
             # --- Send Result to Main Thread for GUI Update ---
-            if window and window.winfo_exists():
-                window.after_idle(update_result, text_to_process, final_result_for_update, False, False)
+            post_to_gui(update_result, text_to_process, final_result_for_update, False, False, request_key)
 
-    # Start the background thread
-    threading.Thread(target=api_call, daemon=True).start()
+    # Run the request on the shared API worker pool
+    submit_api_task(api_call)
 def rephrase_again():
     """
     Handles the 'Rephrase Again' button click.
     Rephrases the 'last_selected_text' based on the current API provider.
     - For LLMs (OpenAI/DeepSeek): Uses a specific rephrase prompt asking for 5 alternatives.
     - For DeepL: Uses a multi-language double-translation technique (EN->X->EN)
-                 with several intermediate languages (TR, FR, RU, IT, ES)
-                 and lists all successful, unique results. Saves to history.
+                 with several intermediate languages (TR, FR, RU, IT, ES).
+                 The forward translations run in parallel; all back-translations
+                 are sent as one batched request. Lists all successful results
+                 and saves to history.
     """
-    global last_selected_text, api_provider_var, window, source_language_var, rephrased_textbox, deepl_translator
-    global history_data, last_translation, last_history_source_language, last_history_target_language # For history saving
 
     # --- Initial Checks and Logging ---
-    current_provider = api_provider_var.get() if api_provider_var else "N/A"
+    current_provider = get_selected_provider("N/A")
     if not last_selected_text:
         messagebox.showwarning("No Text Found", "Cannot rephrase because the source text is missing.\nPlease perform a translation first.")
         return
@@ -1121,12 +1726,19 @@ def rephrase_again():
                 error_msg_only = text_to_display.replace("__ERROR__::", "")
                 messagebox.showerror("Rephrase Error", f"Could not rephrase:\n\n{error_msg_only}")
                 display_text = "[Rephrasing failed, see error message]"
-            rephrased_textbox.config(state='normal'); rephrased_textbox.delete("1.0", tk.END)
-            rephrased_textbox.insert(tk.END, display_text); rephrased_textbox.config(state='normal')
+            rephrased_textbox.config(state='normal')
+            rephrased_textbox.replace("1.0", tk.END, display_text)
         except tk.TclError: pass # Ignore if widget destroyed during update
         except Exception as e_update: print(f"Unexpected error in update_rephrase_box: {e_update}"); traceback.print_exc()
         finally: update_button_states(action_was_tr_to_en=False) # Update buttons after action
 
+    def show_rephrase_progress(done, total):
+        """Shows how many DeepL intermediate translations have finished so far."""
+        if not (rephrased_textbox and rephrased_textbox.winfo_exists()): return
+        try:
+            rephrased_textbox.replace("1.0", tk.END, f"[Rephrasing via intermediate languages... {done}/{total}]")
+        except tk.TclError: pass # Ignore if widget destroyed during update
+
     # --- Main Logic: DeepL vs LLM ---
 
     # A. DeepL: Multi-Language Double Translation
@@ -1135,9 +1747,6 @@ def rephrase_again():
              messagebox.showerror("API Error", "DeepL API Key not configured or translator not initialised."); return
 
         intermediate_codes = ["TR", "FR", "RU", "IT", "ES"] # Languages for variation
-        results = [] # Stores results from threads
-        threads = []
-        results_lock = threading.Lock() # Thread-safe access to results list
 
         try:
             source_lang_code = get_deepl_source_code(source_language_display_name) # e.g., 'EN'
@@ -1145,47 +1754,54 @@ def rephrase_again():
         except Exception as e_lang:
              messagebox.showerror("Language Error", f"Could not get DeepL language codes: {e_lang}"); return
 
-        # --- Thread function for double translation via one intermediate language ---
-        def perform_double_translation(intermediate_code, src_code, tgt_code, text, translator, results_list, lock):
-            rephrased_output = None; error_output = None
+        # --- Worker function for Step 1: Source -> one intermediate language ---
+        def translate_to_intermediate(intermediate_code, src_code, text, translator):
+            intermediate_text = None
             try:
-                # Step 1: Source -> Intermediate
+                wait_for_rate_limit("DeepL") # Direct client call, so pace it like ask_ai does
                 step1_result = translator.translate_text(text, source_lang=src_code, target_lang=intermediate_code)
                 intermediate_text = step1_result.text
-                if not intermediate_text: raise ValueError(f"Intermediate ({intermediate_code}) empty")
-                # Step 2: Intermediate -> Target (Original Source Language)
-                step2_result = translator.translate_text(intermediate_text, source_lang=intermediate_code, target_lang=tgt_code)
-                rephrased_output = step2_result.text
-                if not rephrased_output: raise ValueError(f"Final ({tgt_code}) empty via {intermediate_code}")
+                if not intermediate_text: print(f"DeepL Rephrase: intermediate ({intermediate_code}) empty")
             # Catch specific and general errors
-            except deepl.DeepLException as e: error_output = f"DeepL API Error via {intermediate_code}: {e}"
-            except ValueError as e: error_output = f"ValueError via {intermediate_code}: {e}"
-            except Exception as e: error_output = f"Unexpected error via {intermediate_code}: {type(e).__name__}: {e}"; traceback.print_exc() # Log unexpected
-            # Append result or error to shared list safely
-            with lock:
-                results_list.append(rephrased_output if not error_output else f"__ERROR__::{error_output}")
-
-        # --- Create and start threads ---
-        for code in intermediate_codes:
-            thread = threading.Thread(target=perform_double_translation, args=(code, source_lang_code, target_lang_code, last_selected_text, deepl_translator, results, results_lock), daemon=True, name=f"DeepL-{code}")
-            threads.append(thread); thread.start()
-
-        # --- Function to process results after threads complete ---
-        def process_deepl_results():
-            # Wait for all threads (with timeout)
-            for i, thread in enumerate(threads):
-                 thread.join(timeout=60.0)
-                 if thread.is_alive(): print(f"Warning: Thread {thread.name} timed out.")
+            except deepl.DeepLException as e: print(f"DeepL API Error via {intermediate_code}: {e}")
+            except Exception as e: log_error(f"Unexpected error via {intermediate_code}: {type(e).__name__}: {e}") # Log unexpected
+            return intermediate_text
 
-            # Collect all successful, non-error results
+        # --- Function to run the fan-out and process its results ---
+        def process_deepl_results():
+            # Step 1: All intermediate translations in parallel. Results are collected as they
+            # finish (one 60 s deadline for the whole set) and progress is shown meanwhile.
+            total = len(intermediate_codes)
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=total, thread_name_prefix="DeepL-Rephrase")
+            futures = {executor.submit(translate_to_intermediate, code, source_lang_code, last_selected_text, deepl_translator): code
+                       for code in intermediate_codes}
+            results = {}
+            finished = 0
+            try:
+                for future in concurrent.futures.as_completed(futures, timeout=60.0):
+                    finished += 1
+                    intermediate_text = future.result()
+                    if intermediate_text: results[futures[future]] = intermediate_text
+                    post_to_gui(show_rephrase_progress, finished, total)
+            except concurrent.futures.TimeoutError:
+                print(f"Warning: {total - finished} DeepL intermediate translation(s) timed out.")
+            finally:
+                executor.shutdown(wait=False) # Do not block on calls that timed out
+
+            # Keep output order following intermediate_codes, whatever order they finished in
+            intermediates = [(code, results[code]) for code in intermediate_codes if code in results]
+
+            # Step 2: Back-translate all intermediates in a single request. The texts are in
+            # different languages, so DeepL detects the source language of each one.
             valid_rephrases = []
-            with results_lock: # Access shared list safely
-                for res in results:
-                    if isinstance(res, str) and not res.startswith("__ERROR__::"):
-                         res_strip = res.strip()
-                         if res_strip: # Ensure it's not empty after stripping
+            if intermediates:
+                batch_result = ask_ai(None, [text for _, text in intermediates], target_lang_code, None, provider="DeepL", use_cache=False)
+                if isinstance(batch_result, dict):
+                    for res in batch_result.get("translated") or []:
+                        res_strip = (res or "").strip()
+                        if res_strip: # Ensure it's not empty after stripping
                             valid_rephrases.append(res_strip)
-                    # else: log error if needed
+                else: print(f"DeepL Rephrase (back-translation) failed: {batch_result}")
 
             # Format the output list
             if valid_rephrases:
@@ -1201,17 +1817,16 @@ def rephrase_again():
                 history_translated_text = last_translation or "[Previous translation missing]"
                 history_rephrased_text = formatted_output # Save the formatted list
                 translation_direction = f"{last_history_source_language} -> {last_history_target_language}" or "Unknown Direction"
-                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                ts = time.strftime(HISTORY_TIME_FORMAT)
                 new_history_entry = { "time": ts, "original": history_original_text, "translated": history_translated_text, "rephrased": history_rephrased_text, "provider": f"{current_provider} (Rephrase)", "target_language": translation_direction }
-                history_data.append(new_history_entry); sort_history_data(); save_history_to_xml(history_data)
-            except Exception as e_hist: print(f"!!! Error saving DeepL rephrase to history: {e_hist}"); traceback.print_exc()
+                add_history_entry(new_history_entry)
+            except Exception as e_hist: log_error(f"!!! Error saving DeepL rephrase to history: {e_hist}")
 
             # --- Update GUI ---
-            if window and window.winfo_exists():
-                 window.after(0, update_rephrase_box, formatted_output)
+            post_to_gui(update_rephrase_box, formatted_output)
 
-        # Start a separate thread to wait for and process results, keeping GUI responsive
-        threading.Thread(target=process_deepl_results, daemon=True).start()
+        # Run the fan-out and result processing on the API pool, keeping GUI responsive
+        submit_api_task(process_deepl_results)
 
 
     # B. LLM (OpenAI / DeepSeek) for Normal Rephrase
@@ -1224,19 +1839,18 @@ def rephrase_again():
         def llm_api_call():
             raw_llm_result = None # Initialise
             try:
-                raw_llm_result = ask_ai(prompt=prompt_) # Returns string or error string
+                raw_llm_result = ask_ai(prompt=prompt_, use_cache=False) # Fresh variants on every click
                 if raw_llm_result is None: raw_llm_result = "__ERROR__::LLM API call returned None."
                 # Let update_result handle history and GUI update
-                if window and window.winfo_exists():
-                    window.after_idle(update_result, last_selected_text, raw_llm_result, True, False)
+                post_to_gui(update_result, last_selected_text, raw_llm_result, True, False)
             except Exception as e:
-                error_message = f"Unexpected error during LLM rephrase thread: {type(e).__name__}: {e}"; print(error_message); traceback.print_exc()
+                error_message = f"Unexpected error during LLM rephrase thread: {type(e).__name__}: {e}"; log_error(error_message)
                 error_result = f"__ERROR__::{error_message}"
                 # Send error to update_result for history logging and GUI update
-                if window and window.winfo_exists(): window.after_idle(update_result, last_selected_text, error_result, True, False)
-                update_button_states(action_was_tr_to_en=False) # Update buttons on error too
+                post_to_gui(update_result, last_selected_text, error_result, True, False)
+                post_to_gui(update_button_states, False) # Update buttons on error too
 
-        threading.Thread(target=llm_api_call, daemon=True).start()
+        submit_api_task(llm_api_call)
 
 
 def translate_to_source():
@@ -1245,7 +1859,7 @@ def translate_to_source():
     Takes text from the target box, translates it to the selected source language,
     updates the source text box, and saves to history.
     """
-    global translated_textbox, last_history_source_language, last_history_target_language, window, api_provider_var, source_language_var, target_language_var
+    global last_history_source_language, last_history_target_language
 
     if not translated_textbox: return
     text_to_translate_back = translated_textbox.get("1.0", tk.END).strip()
@@ -1254,7 +1868,7 @@ def translate_to_source():
         return
 
     # Get current settings
-    provider = api_provider_var.get() if api_provider_var else "DeepL"
+    provider = get_selected_provider("DeepL")
     # Target of this operation is the original Source Language
     final_target_lang_display = source_language_var.get() if source_language_var else "English"
     # Source of this operation is the current Target Language
@@ -1264,6 +1878,9 @@ def translate_to_source():
     last_history_source_language = current_text_lang_display # e.g., Turkish
     last_history_target_language = final_target_lang_display # e.g., English
 
+    # Size check up front: DeepL rejects oversized requests, so large text is split by sentence
+    deepl_chunks = split_text_for_deepl(text_to_translate_back) if provider == "DeepL" else None
+
     # --- Background API Call ---
     def api_call():
         final_result_for_update = "__ERROR__::Back-translation failed." # Default error
@@ -1271,9 +1888,13 @@ def translate_to_source():
         try:
             # A. DeepL Back-Translation
             if provider == "DeepL":
-                source_lang_code = get_deepl_source_code(current_text_lang_display) # e.g., TR
-                target_lang_code = get_deepl_target_code(final_target_lang_display) # e.g., EN-GB
-                deepl_dict_result = ask_ai( None, text_to_translate_back, target_lang_code, source_lang_code )
+                # Precomputed maps read directly (same results as get_deepl_source/target_code)
+                source_lang_code = _DEEPL_SRC.get(current_text_lang_display, current_text_lang_display) # e.g., TR
+                target_lang_code = _DEEPL_TGT.get(final_target_lang_display, final_target_lang_display) # e.g., EN-GB
+                if len(deepl_chunks) == 1:
+                    deepl_dict_result = ask_ai( None, text_to_translate_back, target_lang_code, source_lang_code )
+                else: # Too large for one request: translate the pieces in parallel and stitch them
+                    deepl_dict_result = translate_deepl_chunks(deepl_chunks, target_lang_code, source_lang_code)
                 if isinstance(deepl_dict_result, dict) and "translated" in deepl_dict_result:
                     final_result_for_update = deepl_dict_result["translated"]
                 elif isinstance(deepl_dict_result, str) and deepl_dict_result.startswith("__ERROR__::"):
@@ -1290,34 +1911,80 @@ def translate_to_source():
                         # Clean potential LLM formatting prefixes
                         cleaned_res = raw_llm_result.strip().replace('"', '')
                         kw = f"{final_target_lang_display} Translation:"
-                        final_result_for_update = cleaned_res[len(kw):].strip() if cleaned_res.lower().startswith(kw.lower()) else cleaned_res
+                        # Case-insensitive prefix check on the prefix only, not the whole reply
+                        final_result_for_update = cleaned_res[len(kw):].strip() if cleaned_res[:len(kw)].casefold() == kw.casefold() else cleaned_res
                 else: final_result_for_update = f"__ERROR__::LLM Error: Unexpected back-translation type ({type(raw_llm_result)})."
 
         except Exception as e:
-            error_message = f"Error during back-translation thread: {type(e).__name__}: {e}"; print(error_message); traceback.print_exc()
+            error_message = f"Error during back-translation thread: {type(e).__name__}: {e}"; log_error(error_message)
             final_result_for_update = f"__ERROR__::{error_message}"
         finally:
              # Send result to main thread
-             if window and window.winfo_exists():
-                 # text_to_translate_back is Original for history (e.g., Turkish)
-                 # final_result_for_update is Translated for history (e.g., English)
-                 window.after_idle(update_result, text_to_translate_back, final_result_for_update, False, True)
+             # text_to_translate_back is Original for history (e.g., Turkish)
+             # final_result_for_update is Translated for history (e.g., English)
+             post_to_gui(update_result, text_to_translate_back, final_result_for_update, False, True)
+
+    # Run the request on the shared API worker pool
+    submit_api_task(api_call)
+
 
-    # Start the background thread
-    threading.Thread(target=api_call, daemon=True).start()
+# --- Worker -> GUI Dispatch ---
+# Worker threads queue GUI callbacks here; the Tk main thread drains the queue on a timer,
+# so workers never make Tcl calls (winfo_exists / after) themselves.
+GUI_Q = queue.SimpleQueue()
+# The timer also wakes mainloop out of Tcl's event wait, which is when Python gets to run a
+# pending SIGINT handler; so Ctrl+C in the console exits within this interval.
+GUI_DRAIN_INTERVAL_MS = 50
 
+def post_to_gui(fn, *args):
+    """Schedules fn(*args) to run on the Tk main thread. Safe to call from any thread."""
+    GUI_Q.put((fn, args))
+
+def drain_gui_queue():
+    """Runs every queued GUI callback, then re-arms itself (runs on the Tk main thread)."""
+    try:
+        while True:
+            try: fn, args = GUI_Q.get_nowait()
+            except queue.Empty: break
+            try: fn(*args)
+            except Exception as e: print(f"Error in GUI callback {getattr(fn, '__name__', fn)}: {e}"); traceback.print_exc()
+    finally:
+        if window:
+            try: window.after(GUI_DRAIN_INTERVAL_MS, drain_gui_queue)
+            except tk.TclError: pass # Window destroyed: stop draining
+
+# --- Status Line ---
+def show_status(title, message, duration_ms=3000):
+    """
+    Shows a non-modal status message that clears itself after duration_ms.
+    Uses the status line of the main window, or an OS tray notification while the
+    window is hidden. Must be called on the Tk main thread.
+    """
+    global _status_clear_job
+    try:
+        if window and window.winfo_exists() and window.state() == 'withdrawn' and tray_icon:
+            tray_icon.notify(message, title) # Returns immediately
+            return
+    except Exception as e:
+        print(f"Tray notification unavailable: {e}") # Fall back to the status line
+
+    if not (status_label and status_label.winfo_exists()):
+        print(f"{title}: {message}")
+        return
+    try:
+        status_label.config(text=f"{title}: {message}")
+        if _status_clear_job: window.after_cancel(_status_clear_job)
+        _status_clear_job = window.after(duration_ms, lambda: status_label.config(text=""))
+    except tk.TclError: pass # Window destroyed
 
 # --- GUI Creation ---
 def show_gui(make_visible=False):
     """Creates or shows the main application window."""
-    # Ensure all required globals are accessible
-    global window, original_textbox, translated_textbox, rephrased_textbox
+    # Widgets and variables created here are module globals
+    global window, original_textbox, original_textbox_alive, translated_textbox, rephrased_textbox
     global rephrase_button, translate_button, reverse_translate_button, history_button
     global style_dropdown, api_dropdown, target_language_dropdown, source_language_dropdown
-    global font_size, style_var, api_provider_var, target_language_var, source_language_var
-    # Add necessary imports if not already global
-    global deepl_translator, DEEPSEEK_API_KEY, openai_client, supported_languages, style_options
-    global update_gui_after_reload, update_button_states, run_translate_rephrase, translate_to_source, rephrase_again, show_history
+    global style_var, api_provider_var, target_language_var, source_language_var, status_label
 
     # If window exists, just show it
     if window is not None:
@@ -1336,6 +2003,7 @@ def show_gui(make_visible=False):
         window.geometry("900x750")
         window.minsize(850, 600)
         window.configure(bg="#f0f0f0")
+        window.after(GUI_DRAIN_INTERVAL_MS, drain_gui_queue) # Start delivering worker results
 
         # --- Configure Styles ---
         style = ttk.Style(window)
@@ -1369,10 +2037,11 @@ def show_gui(make_visible=False):
         style.configure("Clear.Small.TButton", foreground="white", background="#dc3545", font=('Segoe UI', 7, 'bold'))
         style.map("Clear.Small.TButton", background=[('active', '#c82333'), ('disabled', '#f8d7da')])
         style.configure("TextArea.TFrame", background="white", borderwidth=1, relief="solid")
+        style.configure("Status.TLabel", background="#f0f0f0", foreground="#6c757d", font=('Segoe UI', 8))
 
         window.columnconfigure(0, weight=1); window.rowconfigure(1, weight=1)
-        def on_close(): window.withdraw();
-        window.protocol("WM_DELETE_WINDOW", on_close)
+        # Closing only hides the window to the tray; exit_app is the only path that destroys it
+        window.protocol("WM_DELETE_WINDOW", window.withdraw)
 
         # --- Top Control Panel ---
         top_controls_frame = ttk.Frame(window, padding=(10, 10, 10, 5)); top_controls_frame.grid(row=0, column=0, sticky="ew")
@@ -1389,13 +2058,17 @@ def show_gui(make_visible=False):
         if api_provider_var is None: api_provider_var = tk.StringVar(value=default_provider)
         api_dropdown = ttk.Combobox(api_frame, textvariable=api_provider_var, values=available_providers, state="readonly", width=12, font=('Segoe UI', 9)); api_dropdown.pack(side="left")
         if default_provider == "No APIs Configured": api_dropdown.config(state="disabled")
-        api_provider_var.trace_add("write", lambda *a: update_gui_after_reload())
+        def on_provider_change(*_):
+            update_selected_provider() # Refresh the cache before anything reads it
+            update_gui_after_reload()
+        api_provider_var.trace_add("write", on_provider_change)
+        update_selected_provider()
 
         # Source Language Dropdown
         source_lang_frame = ttk.Frame(top_controls_frame); source_lang_frame.grid(row=0, column=1, padx=(5,5), sticky="w")
         ttk.Label(source_lang_frame, text="Source:", style="Bold.TLabel").pack(side="left", padx=(0, 5))
         if source_language_var is None: source_language_var = tk.StringVar(value="English")
-        lang_source_vals = list(supported_languages.get(api_provider_var.get(), {}).keys()) or ["English"]
+        lang_source_vals = _lang_values_cache.get(api_provider_var.get()) or ("English",)
         source_language_dropdown = ttk.Combobox(source_lang_frame, textvariable=source_language_var, values=lang_source_vals, state="readonly", width=15, font=('Segoe UI', 9)); source_language_dropdown.pack(side="left")
         source_language_var.trace_add("write", lambda *a: update_button_states())
 
@@ -1403,7 +2076,7 @@ def show_gui(make_visible=False):
         target_lang_frame = ttk.Frame(top_controls_frame); target_lang_frame.grid(row=0, column=2, padx=(5,5), sticky="w")
         ttk.Label(target_lang_frame, text="Target:", style="Bold.TLabel").pack(side="left", padx=(0, 5))
         if target_language_var is None: target_language_var = tk.StringVar(value="Turkish")
-        lang_target_vals = list(supported_languages.get(api_provider_var.get(), {}).keys()) or ["Turkish"]
+        lang_target_vals = _lang_values_cache.get(api_provider_var.get()) or ("Turkish",)
         target_language_dropdown = ttk.Combobox(target_lang_frame, textvariable=target_language_var, values=lang_target_vals, state="readonly", width=15, font=('Segoe UI', 9)); target_language_dropdown.pack(side="left")
         target_language_var.trace_add("write", lambda *a: update_button_states())
 
@@ -1411,6 +2084,8 @@ def show_gui(make_visible=False):
         style_frame = ttk.Frame(top_controls_frame); style_frame.grid(row=0, column=3, padx=(5, 15), sticky="w")
         ttk.Label(style_frame, text="Style:", style="Bold.TLabel").pack(side="left", padx=(0, 5))
         if style_var is None: style_var = tk.StringVar(value="Simple English")
+        style_var.trace_add("write", update_selected_style)
+        update_selected_style()
         style_dropdown = ttk.Combobox(style_frame, textvariable=style_var, values=list(style_options.keys()), state="disabled", width=18, font=('Segoe UI', 9)); style_dropdown.pack(side="left")
 
         # History Button
@@ -1441,6 +2116,8 @@ def show_gui(make_visible=False):
             scrollbar = ttk.Scrollbar(text_container, orient="vertical", command=text_box.yview)
             text_box.configure(yscrollcommand=scrollbar.set)
             text_box.grid(row=0, column=0, sticky="nsew"); scrollbar.grid(row=0, column=1, sticky="ns")
+            # Font in effect, kept here so resizing needs no Tk font introspection
+            text_box._font_state = {'family': 'Segoe UI', 'size': font_size, 'weight': 'normal', 'slant': 'roman'}
 
             # <<< Bağlam Menüsünü Ekle (Bu zaten vardı) >>>
             add_text_widget_context_menu(text_box)
@@ -1462,24 +2139,15 @@ def show_gui(make_visible=False):
                 """Changes the font size of the text box."""
                 try:
                     if not (text_box and text_box.winfo_exists()): return
-                    # Get current font properties
-                    current_font = tkFont.Font(font=text_box.cget("font"))
-                    actual_font_info = current_font.actual()
-                    current_size = abs(actual_font_info.get('size', font_size)) # Use abs for negative sizes on some systems
+                    state = text_box._font_state
                     # Calculate new size with limits
-                    new_size = max(8, min(20, current_size + delta))
-                    # Apply new font settings
-                    text_box.config(font=(
-                        actual_font_info.get('family', 'Segoe UI'), # Keep family
-                        new_size,
-                        actual_font_info.get('weight', 'normal'), # Keep weight
-                        actual_font_info.get('slant', 'roman')     # Keep slant
-                    ))
+                    new_size = max(8, min(20, state['size'] + delta))
+                    if new_size == state['size']: return # Already at the limit
+                    state['size'] = new_size
+                    # Apply new font settings (family, weight and slant are kept)
+                    text_box.config(font=(state['family'], state['size'], state['weight'], state['slant']))
                 except tk.TclError:
                     pass # Widget might be destroyed
-                except Exception as e:
-                    # Log other potential errors (e.g., issues getting font info)
-                    print(f"Error changing font size: {e}")
             # === DEĞİŞİKLİK SONU ===
 
             # Control Buttons (+, -, C) - Komutları düzeltilmiş fonksiyonlara bağla
@@ -1493,6 +2161,11 @@ def show_gui(make_visible=False):
         # --- Create Text Areas and Buttons ---
         button_width=35
         original_textbox = create_ui_text_area(content_area, 0, "Source Text", "📋")
+        original_textbox_alive = True
+        def on_original_textbox_destroy(event):
+            global original_textbox_alive
+            original_textbox_alive = False
+        original_textbox.bind("<Destroy>", on_original_textbox_destroy, add="+")
         act_frame1 = ttk.Frame(content_area); act_frame1.grid(row=1, column=0, sticky="e", pady=(5,10))
         translate_button = ttk.Button(act_frame1, text="Translate...", style="Success.TButton", command=run_translate_rephrase, width=button_width); translate_button.pack()
         translated_textbox = create_ui_text_area(content_area, 2, "Translated Text (Target)", "🌐")
@@ -1502,6 +2175,10 @@ def show_gui(make_visible=False):
         act_frame3 = ttk.Frame(content_area); act_frame3.grid(row=5, column=0, sticky="e", pady=(5,0))
         rephrase_button = ttk.Button(act_frame3, text="Rephrase Again", style="Warning.TButton", command=rephrase_again, width=button_width); rephrase_button.pack()
 
+        # --- Status Line ---
+        status_label = ttk.Label(window, text="", style="Status.TLabel", anchor="w", padding=(12, 0, 10, 4))
+        status_label.grid(row=2, column=0, sticky="ew")
+
         # --- Initialise GUI State ---
         update_gui_after_reload() # Ensure correct initial state based on loaded keys
         window.withdraw() # Start hidden
@@ -1510,99 +2187,130 @@ def show_gui(make_visible=False):
 
 # --- Button/Widget State Updates ---
 def update_button_states(action_was_tr_to_en=False):
-    """Updates the state and text of buttons and dropdowns based on current selections and state."""
-    global rephrase_button, translate_button, reverse_translate_button, api_provider_var, style_var, last_selected_text, style_dropdown, api_dropdown, target_language_var, target_language_dropdown, source_language_var, source_language_dropdown
+    """
+    Updates the state and text of buttons and dropdowns based on current selections and state.
+    Calls made while an update is already queued are coalesced into that one update (which
+    uses the latest action_was_tr_to_en), so cascading variable traces reconfigure once.
+    """
+    global _button_update_pending, _button_update_tr_to_en
+    _button_update_tr_to_en = action_was_tr_to_en
+    if _button_update_pending: return
+    # Schedule the update using after_idle for safety
+    if window and window.winfo_exists():
+        _button_update_pending = True
+        window.after_idle(_do_update_button_states)
+
+def _do_update_button_states():
+    """Performs the actual update logic for update_button_states. Called via after_idle."""
+    global _button_update_pending
+    _button_update_pending = False # Requests from here on schedule a fresh update
+    action_was_tr_to_en = _button_update_tr_to_en
+    # Check if all required widgets exist before proceeding
+    required_widgets = [ window, rephrase_button, translate_button, reverse_translate_button, api_provider_var, api_dropdown, target_language_var, target_language_dropdown, source_language_var, source_language_dropdown, style_dropdown, style_var ]
+    if not all(widget and getattr(widget, 'winfo_exists', lambda: True)() for widget in required_widgets):
+        return # Skip update if GUI elements are not ready or destroyed
 
-    def do_update():
-        """Performs the actual update logic. Called via after_idle."""
-        # Check if all required widgets exist before proceeding
-        required_widgets = [ window, rephrase_button, translate_button, reverse_translate_button, api_provider_var, api_dropdown, target_language_var, target_language_dropdown, source_language_var, source_language_dropdown, style_dropdown, style_var ]
-        if not all(widget and getattr(widget, 'winfo_exists', lambda: True)() for widget in required_widgets):
-            return # Skip update if GUI elements are not ready or destroyed
+    try:
+        provider = api_provider_var.get()
+        target_lang = target_language_var.get() or "Target"
+        source_lang = source_language_var.get() or "Source"
+        is_api_usable = (provider != "No APIs Configured")
+        # Rephrase is possible if API is usable and source text exists (and not immediately after a back-translation)
+        has_text_for_rephrase = bool(last_selected_text and not action_was_tr_to_en)
+
+        # --- Update Translate Button ---
+        state_trans = 'normal' if is_api_usable else 'disabled'
+        if provider == "DeepL": text_trans = f"Translate ({source_lang} -> {target_lang})"
+        else: text_trans = f"Translate & Rephrase ({source_lang} -> {target_lang})"
+        if not is_api_usable: text_trans = "Translate & Rephrase" # Default text when disabled
+        translate_button.configure(text=text_trans, state=state_trans)
+
+        # --- Update Reverse Translate Button ---
+        state_rev = 'normal' if is_api_usable else 'disabled'
+        text_rev = f"Translate Back ({target_lang} -> {source_lang})"
+        reverse_translate_button.configure(text=text_rev, state=state_rev)
+
+        # --- Update Rephrase Button ---
+        # Active if API is usable AND there's text to rephrase
+        state_rephrase = 'normal' if (is_api_usable and has_text_for_rephrase) else 'disabled'
+        rephrase_button.configure(state=state_rephrase)
+
+        # --- Update Style Dropdown ---
+        # Active if API is usable (even for DeepL, though it has no effect)
+        state_style = 'readonly' if is_api_usable else 'disabled'
+        style_dropdown.configure(state=state_style)
+
+        # --- Update Language Dropdowns ---
+        state_lang = 'readonly' if is_api_usable else 'disabled'
+        target_language_dropdown.configure(state=state_lang)
+        source_language_dropdown.configure(state=state_lang)
+
+    except tk.TclError: pass # Ignore errors if widgets are destroyed during update
+    except Exception as e: print(f"Error updating button/widget states: {e}"); traceback.print_exc()
 
-        try:
-            provider = api_provider_var.get()
-            target_lang = target_language_var.get() or "Target"
-            source_lang = source_language_var.get() or "Source"
-            is_api_usable = (provider != "No APIs Configured")
-            # Rephrase is possible if API is usable and source text exists (and not immediately after a back-translation)
-            has_text_for_rephrase = bool(last_selected_text and not action_was_tr_to_en)
-
-            # --- Update Translate Button ---
-            state_trans = 'normal' if is_api_usable else 'disabled'
-            if provider == "DeepL": text_trans = f"Translate ({source_lang} -> {target_lang})"
-            else: text_trans = f"Translate & Rephrase ({source_lang} -> {target_lang})"
-            if not is_api_usable: text_trans = "Translate & Rephrase" # Default text when disabled
-            translate_button.configure(text=text_trans, state=state_trans)
-
-            # --- Update Reverse Translate Button ---
-            state_rev = 'normal' if is_api_usable else 'disabled'
-            text_rev = f"Translate Back ({target_lang} -> {source_lang})"
-            reverse_translate_button.configure(text=text_rev, state=state_rev)
-
-            # --- Update Rephrase Button ---
-            # Active if API is usable AND there's text to rephrase
-            state_rephrase = 'normal' if (is_api_usable and has_text_for_rephrase) else 'disabled'
-            rephrase_button.configure(state=state_rephrase)
-
-            # --- Update Style Dropdown ---
-            # Active if API is usable (even for DeepL, though it has no effect)
-            state_style = 'readonly' if is_api_usable else 'disabled'
-            style_dropdown.configure(state=state_style)
-
-            # --- Update Language Dropdowns ---
-            state_lang = 'readonly' if is_api_usable else 'disabled'
-            target_language_dropdown.configure(state=state_lang)
-            source_language_dropdown.configure(state=state_lang)
-
-        except tk.TclError: pass # Ignore errors if widgets are destroyed during update
-        except Exception as e: print(f"Error updating button/widget states: {e}"); traceback.print_exc()
 
-    # Schedule the update using after_idle for safety
-    if window and window.winfo_exists(): window.after_idle(do_update)
+# --- History Window ---
+# Display layout of one history entry, filled with str.format_map
+_HISTORY_ENTRY_TEMPLATE = ("=== 🕒 {time} (API: {provider}, Lang: {target_language}) ===\n"
+                           "📋 Original:\n{original}\n\n"
+                           "🌐 Translation:\n{translated}\n\n"
+                           "🇬🇧 Rephrased:\n{rephrased}\n"
+                           + "-"*60 + "\n\n")
+# Shown for fields an entry lacks (loaded and new entries normally have all of them)
+_HISTORY_ENTRY_DEFAULTS = {"time": "N/A", "provider": "N/A", "target_language": "N/A",
+                           "original": "", "translated": "", "rephrased": "[N/A]"}
+
+def format_history_entry(item):
+    """Formats one history entry for the history window."""
+    try:
+        return _HISTORY_ENTRY_TEMPLATE.format_map(item)
+    except KeyError:
+        return _HISTORY_ENTRY_TEMPLATE.format_map({**_HISTORY_ENTRY_DEFAULTS, **item})
 
+def render_history_page(hist_text_widget):
+    """
+    Appends the next HISTORY_PAGE_SIZE entries of the widget's history snapshot. Pages after
+    the first are only inserted when the user scrolls near the bottom, so the amount of text
+    handed to Tk stays bounded however large the history is.
+    """
+    entries, start = hist_text_widget._entries, hist_text_widget._next_idx
+    if start >= len(entries): return # Everything is shown
+    end = start + HISTORY_PAGE_SIZE
+    hist_text_widget._next_idx = end
+    try:
+        hist_text_widget.config(state='normal')
+        hist_text_widget.insert(tk.END, "".join(map(format_history_entry, entries[start:end])))
+        hist_text_widget.config(state='disabled')
+    except tk.TclError: pass # History window closed
 
-# --- History Window ---
 def update_history_window_content():
     """Helper function to refresh the content of the history window if open."""
-    global history_window, history_data
     if not (history_window and history_window.winfo_exists()): return
+    ensure_history_loaded() # Normally long done; only the very first open right after startup waits
 
     try:
-        # Find the Text widget within the history window structure
-        hist_text_widget = None
-        for widget in history_window.winfo_children():
-            if isinstance(widget, ttk.Frame): # Assuming content is in a Frame
-                for sub_widget in widget.winfo_children():
-                    if isinstance(sub_widget, tk.Text):
-                        hist_text_widget = sub_widget; break
-            if hist_text_widget: break
+        # Text widget stored by show_history (no walk over the widget tree)
+        hist_text_widget = getattr(history_window, '_hist_text', None)
 
         if hist_text_widget:
             hist_text_widget.config(state='normal')
             hist_text_widget.delete("1.0", tk.END)
+            # Assumes history_data is sorted. Snapshot it, since it may change while later
+            # pages are still to be rendered.
+            hist_text_widget._entries = list(history_data)
+            hist_text_widget._next_idx = 0
             if not history_data:
                 hist_text_widget.insert(tk.END, "History is empty.\n")
+                hist_text_widget.config(state='disabled')
             else:
-                history_content = []
-                for item in history_data: # Assumes history_data is sorted
-                    entry = (f"=== 🕒 {item.get('time', 'N/A')} (API: {item.get('provider', 'N/A')}, Lang: {item.get('target_language', 'N/A')}) ===\n"
-                             f"📋 Original:\n{item.get('original', '')}\n\n"
-                             f"🌐 Translation:\n{item.get('translated', '')}\n\n"
-                             f"🇬🇧 Rephrased:\n{item.get('rephrased', '[N/A]')}\n"
-                             + "-"*60 + "\n\n")
-                    history_content.append(entry)
-                hist_text_widget.insert(tk.END, "".join(history_content))
-            hist_text_widget.config(state='disabled')
+                render_history_page(hist_text_widget) # First page; the rest follows on scroll
             hist_text_widget.yview_moveto(0.0) # Scroll to top
     except Exception as e:
         print(f"Could not update open history window: {e}")
 
 def show_history():
     """Displays the translation history window."""
-    global history_window, history_data # Ensure history_data is accessible
-    # Ensure helper is accessible if defined elsewhere, or define it here
-    # global update_history_window_content
+    global history_window
 
     # If window exists, bring it to front
     if history_window and history_window.winfo_exists():
@@ -1623,8 +2331,15 @@ def show_history():
     # Text widget to display history
     hist_textbox = tk.Text(hist_frame, wrap=tk.WORD, font=("Consolas", 11), bd=0, highlightthickness=0, relief="flat", padx=5, pady=5, background="white", state='disabled')
     hist_scrollbar = ttk.Scrollbar(hist_frame, orient="vertical", command=hist_textbox.yview)
-    hist_textbox.configure(yscrollcommand=hist_scrollbar.set)
+    hist_textbox._entries, hist_textbox._next_idx = [], 0 # Paging state, filled by update_history_window_content
+
+    def on_history_scroll(first, last):
+        """Updates the scrollbar and renders the next page once the view nears the bottom."""
+        hist_scrollbar.set(first, last)
+        if float(last) > 0.9: render_history_page(hist_textbox)
+    hist_textbox.configure(yscrollcommand=on_history_scroll)
     hist_textbox.grid(row=0, column=0, sticky="nsew"); hist_scrollbar.grid(row=0, column=1, sticky="ns")
+    history_window._hist_text = hist_textbox # Looked up by update_history_window_content
 
     # Populate the text box using the defined helper function
     update_history_window_content() # Call the helper to fill the content
@@ -1645,29 +2360,57 @@ def safe_deiconify():
         except tk.TclError: pass # Ignore if window destroyed during operation
         except Exception as e: print(f"Error during deiconify/focus: {e}"); traceback.print_exc()
 
-def process_clipboard_text():
-    """Processes text from the clipboard: pastes it into the source box and triggers translation."""
-    global hotkey_processing, window, original_textbox
-    if hotkey_processing: return # Prevent concurrent processing
-    hotkey_processing = True
+def begin_hotkey_action():
+    """Atomically claims the hotkey flag. Returns False if an action is already running."""
+    global hotkey_processing
+    with hotkey_lock:
+        if hotkey_processing: return False
+        hotkey_processing = True
+        return True
+
+def end_hotkey_action():
+    """Releases the hotkey flag so the next Ctrl+C+C can be processed."""
+    global hotkey_processing
+    with hotkey_lock:
+        hotkey_processing = False
+
+def clipboard_request_key(text):
+    """Hash of source text plus the settings that affect its translation (for re-trigger checks)."""
+    return hash((text.strip(), get_selected_provider("DeepL"), get_selected_style(),
+                 source_language_var.get() if source_language_var else None,
+                 target_language_var.get() if target_language_var else None))
+
+def force_process_clipboard_text():
+    """Like process_clipboard_text, but translates even if the clipboard has not changed."""
+    process_clipboard_text(force=True)
+
+def process_clipboard_text(force=False):
+    """
+    Processes text from the clipboard: pastes it into the source box and triggers translation.
+    Unless force is set, a clipboard already translated with the same settings only shows the window.
+    """
+    if not begin_hotkey_action(): return # Prevent concurrent processing
     try:
         text = pyperclip.paste()
         if text and text.strip():
             if not (window and window.winfo_exists() and original_textbox):
-                messagebox.showerror("Error", "Main window or text box not ready.")
-                hotkey_processing = False; return
-
-            # Show window first
-            safe_deiconify()
+                end_hotkey_action() # Release before the modal, which blocks until dismissed
+                messagebox.showerror("Error", "Main window or text box not ready."); return
 
-            # Schedule the text update and translation trigger slightly later
+            # Show the window and fill the text box in one callback, so Tk redraws once
             def scheduled_processing(clipboard_text):
-                global hotkey_processing
                 try:
-                    if original_textbox and original_textbox.winfo_exists():
+                    safe_deiconify()
+                    # Set by update_result only for a successful translation of exactly this text
+                    already_shown = (_last_clipboard_key is not None and original_textbox_alive
+                                     and clipboard_request_key(clipboard_text) == _last_clipboard_key
+                                     and original_textbox.get("1.0", tk.END).strip() == clipboard_text.strip())
+                    if already_shown and not force:
+                        # Accidental re-trigger: the result is already on screen, skip the API call
+                        show_status("Already Translated", "Clipboard unchanged. Use 'Force Translate Clipboard' in the tray to redo it.")
+                    elif original_textbox_alive:
                         original_textbox.config(state='normal')
-                        original_textbox.delete("1.0", tk.END)
-                        original_textbox.insert(tk.END, clipboard_text)
+                        original_textbox.replace("1.0", tk.END, clipboard_text)
                         # Call run_translate_rephrase to start the process
                         run_translate_rephrase()
                 except Exception as e_sched:
@@ -1675,106 +2418,166 @@ def process_clipboard_text():
                      traceback.print_exc()
                 finally:
                     # Ensure flag is reset even if errors occur
-                    hotkey_processing = False # Reset flag here
+                    end_hotkey_action() # Reset flag here
 
-            # Use after_idle to ensure window is visible before processing
-            window.after_idle(lambda t=text: scheduled_processing(t))
+            # after(0) runs on the next loop iteration instead of waiting behind all idle tasks
+            window.after(0, scheduled_processing, text)
 
         else:
-            messagebox.showwarning("Clipboard Empty", "No text found in clipboard.")
-            hotkey_processing = False # Reset flag if clipboard is empty
+            end_hotkey_action() # Reset flag if clipboard is empty
+            show_status("Clipboard Empty", "No text found in clipboard.") # Non-modal
     except Exception as e:
+        end_hotkey_action() # Reset flag on error, before reporting it
         print(f"Error processing clipboard: {e}"); traceback.print_exc()
-        messagebox.showerror("Clipboard/Processing Error", f"Could not process clipboard: {e}")
-        hotkey_processing = False # Reset flag on error
+        show_status("Clipboard/Processing Error", f"Could not process clipboard: {e}", duration_ms=6000)
+
+HOTKEY_POLL_INTERVAL = 0.008 # Seconds between key state polls (Windows)
+HOTKEY_BUSY_POLL_INTERVAL = 0.05 # While a hotkey action runs presses are ignored anyway
+
+def poll_ctrl_c_win32(on_press):
+    """
+    Windows only: calls on_press for each Ctrl+C key-down by polling GetAsyncKeyState.
+    Unlike the keyboard library's low-level hook, this runs no Python code for the keys
+    typed in other applications. Never returns.
+    """
+    get_key_state = ctypes.windll.user32.GetAsyncKeyState
+    VK_CONTROL, VK_C = 0x11, 0x43
+    was_down = False
+    while True:
+        is_down = bool(get_key_state(VK_CONTROL) & 0x8000 and get_key_state(VK_C) & 0x8000)
+        if is_down and not was_down: on_press() # Edge only: holding the keys is one press
+        was_down = is_down
+        time.sleep(HOTKEY_BUSY_POLL_INTERVAL if hotkey_processing else HOTKEY_POLL_INTERVAL)
 
 def listen_ctrl_c_c():
-    """Listens for double Ctrl+C presses to trigger clipboard processing."""
-    global hotkey_processing
+    """
+    Listens for double Ctrl+C presses to trigger clipboard processing: by key state polling
+    on Windows, through the keyboard library's hook elsewhere (or if polling fails).
+    The callback runs on the listener thread and only hands the work to the
+    Tk main thread (widgets must not be touched from other threads).
+    """
     double_press_threshold = 0.4 # Max time between presses (seconds)
-    last_ctrl_c_time = 0
+    last_ctrl_c_time = float('-inf') # No first press yet
 
     def on_ctrl_c():
         nonlocal last_ctrl_c_time
-        current_time = time.time()
+        if hotkey_processing: return # Busy: ignore presses without any timing work
+        # Monotonic clock, so wall-clock adjustments cannot fake or swallow a double press
+        current_time = time.monotonic()
         if (current_time - last_ctrl_c_time) < double_press_threshold:
-            if not hotkey_processing:
-                # Schedule the action on the main GUI thread
-                if window: window.after(0, process_clipboard_text)
-            last_ctrl_c_time = 0 # Reset timer after double press
+            last_ctrl_c_time = float('-inf') # Reset timer after double press
+            # Hand the action to the main GUI thread (no Tk call from this thread)
+            post_to_gui(process_clipboard_text)
         else:
             last_ctrl_c_time = current_time # Record time of first press
 
+    if sys.platform == 'win32':
+        try:
+            poll_ctrl_c_win32(on_ctrl_c) # Runs for the lifetime of this thread
+        except Exception as e:
+            print(f"Ctrl+C polling failed ({e}), falling back to the keyboard hook."); traceback.print_exc()
+
     try:
+        import keyboard # Deferred: not needed when Windows key state polling works
         # Register the hotkey (trigger on key down)
         keyboard.add_hotkey('ctrl+c', on_ctrl_c, trigger_on_release=False)
+    # Warnings go through post_to_gui: this runs on the HotkeyListener thread, not the Tk thread
     except ImportError:
         print("Warning: 'keyboard' library not found or requires root/admin privileges for global hotkeys.")
-        messagebox.showwarning("Hotkey Warning", "Could not register global hotkey (Ctrl+C+C).\nThis might require Administrator privileges or the 'keyboard' library.")
+        post_to_gui(messagebox.showwarning, "Hotkey Warning", "Could not register global hotkey (Ctrl+C+C).\nThis might require Administrator privileges or the 'keyboard' library.")
     except Exception as e:
         print(f"Could not register hotkey: {e}"); traceback.print_exc()
-        messagebox.showwarning("Hotkey Error", f"Could not register hotkey:\n{e}")
+        post_to_gui(messagebox.showwarning, "Hotkey Error", f"Could not register hotkey:\n{e}")
 
 
 # --- System Tray Icon Setup ---
+_exiting = threading.Event() # Set once exit_app has started tearing down
+
 def exit_app(icon=None, item=None):
-    """Stops the tray icon and exits the application cleanly."""
-    global tray_icon, window
+    """
+    Stops the tray icon and exits the application cleanly. Safe to call more than once and
+    from any thread: calls from other threads (tray menu) are handed to the Tk main thread.
+    """
+    if _exiting.is_set(): return # Already exiting
+    if window and threading.current_thread() is not threading.main_thread():
+        post_to_gui(exit_app) # Tk must only be destroyed from the thread that runs mainloop
+        return
+    _exiting.set()
     print("Exiting application...")
+    try: flush_history() # Write any pending history entries before exiting
+    except Exception as e: print(f"Error flushing history on exit: {e}")
+    API_POOL.shutdown(wait=False, cancel_futures=True) # Drop queued API work
     if tray_icon and tray_icon.visible:
         try: tray_icon.stop()
         except Exception as e: print(f"Error stopping tray icon: {e}")
     if window:
         try: window.quit(); window.destroy()
         except Exception: pass # Ignore errors during destroy
-    # Use os._exit(0) for a more forceful exit if needed, especially if threads hang
-    sys.exit(0) # Standard exit
-
-def setup_tray_icon_thread():
-    """Sets up and runs the system tray icon in a separate thread."""
-    global tray_icon
-    try:
+    # History is flushed above, so end the process now. sys.exit would wait for the API
+    # executor threads (non-daemon) until each running request ran into its timeout/retries.
+    drain_error_log() # atexit hooks do not run after os._exit
+    try: sys.stdout.flush(); sys.stderr.flush()
+    except Exception: pass
+    os._exit(0)
+
+_tray_image = None # Decoded tray icon, built once by get_tray_image
+
+def get_tray_image():
+    """Returns the tray icon image (RGB), loading and converting it only on the first call."""
+    global _tray_image
+    if _tray_image is None:
+        from PIL import Image # Deferred: only the tray icon needs PIL
         # Load icon image (provide a default if not found)
         icon_path = "deep_translator.png" # Ensure this icon exists
         try:
-             image = Image.open(icon_path)
-             # Ensure RGB format for compatibility
-             if image.mode != 'RGB': image = image.convert('RGB')
+             with Image.open(icon_path) as image:
+                 # Ensure RGB format for compatibility; copy() decodes so the file can be closed
+                 _tray_image = image.convert('RGB') if image.mode != 'RGB' else image.copy()
         except FileNotFoundError:
              print(f"Warning: Icon file '{icon_path}' not found. Using default.")
-             image = Image.new("RGB", (64, 64), color=(30, 130, 90)) # Default green icon
+             _tray_image = Image.new("RGB", (64, 64), color=(30, 130, 90)) # Default green icon
         except Exception as e_img:
              print(f"Error loading icon: {e_img}. Using default.")
-             image = Image.new("RGB", (64, 64), color=(30, 130, 90))
+             _tray_image = Image.new("RGB", (64, 64), color=(30, 130, 90))
+    return _tray_image
 
+def tray_action(fn):
+    """
+    Wraps fn as a tray menu callback that hands it to the Tk main thread via post_to_gui.
+    A plain zero-argument function, since pystray inspects the callback's __code__.
+    """
+    def action(): post_to_gui(fn)
+    return action
+
+def setup_tray_icon():
+    """Builds the system tray icon and starts it detached (pystray runs its own event handling)."""
+    global tray_icon
+    try:
+        from pystray import Icon, MenuItem, Menu # Deferred import, see get_tray_image
+        image = get_tray_image()
     except Exception as e_pil: # Catch errors if PIL is missing
-        print(f"Error initialising PIL Image: {e_pil}. Tray icon unavailable.")
+        print(f"Error initialising pystray/PIL Image: {e_pil}. Tray icon unavailable.")
         return # Cannot proceed without PIL
 
-    # Helper to schedule actions on the main GUI thread
-    def schedule_action(action_func):
-        if window and window.winfo_exists(): window.after(0, action_func)
-
     # Define tray menu items
     menu = Menu(
-        MenuItem("Translate Clipboard (Ctrl+C+C)", lambda: schedule_action(process_clipboard_text), default=True),
-        MenuItem("Show Window", lambda: schedule_action(safe_deiconify)),
-        MenuItem("Show History", lambda: schedule_action(show_history)),
+        MenuItem("Translate Clipboard (Ctrl+C+C)", tray_action(process_clipboard_text), default=True),
+        MenuItem("Force Translate Clipboard", tray_action(force_process_clipboard_text)),
+        MenuItem("Show Window", tray_action(safe_deiconify)),
+        MenuItem("Show History", tray_action(show_history)),
         Menu.SEPARATOR,
-        MenuItem("Load History File...", lambda: schedule_action(prompt_and_load_history)),
-        MenuItem("Backup & Clear History", lambda: schedule_action(backup_and_clear_history)),
+        MenuItem("Load History File...", tray_action(prompt_and_load_history)),
+        MenuItem("Backup & Clear History", tray_action(backup_and_clear_history)),
         Menu.SEPARATOR,
-        MenuItem("Edit API Keys...", lambda: schedule_action(show_config_editor)),
-        MenuItem("Reload Config & Keys", lambda: schedule_action(reload_config_and_clients)),
+        MenuItem("Edit API Keys...", tray_action(show_config_editor)),
+        MenuItem("Reload Config & Keys", tray_action(reload_config_and_clients)),
         Menu.SEPARATOR,
         MenuItem("Exit", exit_app) )
 
-    # Create and run the icon
+    # Create and start the icon; returns immediately, exit_app stops it
     tray_icon = Icon("TranslatorPro", image, "Translator & Rephraser Pro", menu=menu)
-    # Start hotkey listener in a separate thread
-    threading.Thread(target=listen_ctrl_c_c, daemon=True).start()
     try:
-        tray_icon.run() # Blocks until exit_app is called
+        tray_icon.run_detached()
     except Exception as e_tray:
         print(f"Error running tray icon: {e_tray}")
         traceback.print_exc()
@@ -1787,7 +2590,19 @@ if __name__ == "__main__":
 
     # Initial setup
     load_api_keys()
-    reinitialize_clients()
+    # Building the SDK clients does not need the widgets, so overlap it with show_gui below
+    client_init_thread = threading.Thread(target=reinitialize_clients, daemon=True, name="ClientInit")
+    client_init_thread.start()
+
+    threading.Thread(target=log_writer_loop, daemon=True, name="ErrorLogWriter").start()
+    atexit.register(drain_error_log) # Reports still queued at exit (registered first, so it runs last)
+    threading.Thread(target=history_flush_loop, daemon=True, name="HistoryFlusher").start()
+    atexit.register(flush_history) # Final flush for exits that bypass exit_app
+    show_gui(make_visible=False) # Create GUI but keep it hidden initially
+    # Parse the history file in the background; history users wait via ensure_history_loaded()
+    threading.Thread(target=load_history_from_xml, daemon=True, name="HistoryLoader").start()
+    client_init_thread.join() # Before mainloop, so no translation can see a half-initialised client
+    apply_startup_clients()
 
     # Warn if no APIs are configured
     api_configured = bool(openai_client or DEEPSEEK_API_KEY or deepl_translator)
@@ -1798,12 +2613,9 @@ if __name__ == "__main__":
                                "in the tray menu to enable functionality.",
                                icon='warning')
 
-    load_history_from_xml() # Load history on startup
-    show_gui(make_visible=False) # Create GUI but keep it hidden initially
-
-    # Start the system tray icon in its own thread
-    tray_thread = threading.Thread(target=setup_tray_icon_thread, daemon=True)
-    tray_thread.start()
+    # Start the system tray icon (detached, no wrapper thread) and the hotkey listener
+    setup_tray_icon()
+    threading.Thread(target=listen_ctrl_c_c, daemon=True, name="HotkeyListener").start()
 
     # Start the Tkinter main loop (blocks)
     if window: